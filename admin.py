@@ -0,0 +1,180 @@
+"""Локальный HTTP API для управления подписками без перезапуска бота.
+
+    GET    /subscriptions              список подписок
+    POST   /subscriptions              добавить: {"token": ..., "chat_id": ...}
+    GET    /subscriptions/<key>        курсор, статусы и последняя ошибка
+    DELETE /subscriptions/<key>        удалить
+    POST   /subscriptions/<key>/pause  приостановить опрос
+    POST   /subscriptions/<key>/resume возобновить опрос
+    POST   /subscriptions/<key>/poll   опросить немедленно
+    GET    /failures?limit=<n>         открытые сбои, счётчики, последние
+                                       ошибки
+
+Токены в ответах не показываются, подписка адресуется ключом
+`chat_id:отпечаток токена`.
+"""
+import json
+import logging
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from subscriptions import Subscription
+
+
+logger = logging.getLogger(__name__)
+
+PREFIX = '/subscriptions'
+FAILURES = '/failures'
+
+
+class AdminServer:
+    """HTTP API поверх реестра подписок.
+
+    Реестр блокируется только на время изменения списка; опрос по запросу
+    `poll` вызывается в потоке обработчика без удержания блокировок.
+    """
+
+    def __init__(self, registry, poll, host='127.0.0.1', port=0,
+                 token=None, failures=None):
+        self.registry = registry
+        self.poll = poll
+        # Отчёт о сбоях: функция от числа последних ошибок
+        self.failures = failures
+        self.token = token
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """Базовый адрес API."""
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Запускает сервер в фоновом потоке."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={'poll_interval': 0.05},
+            name='admin',
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info(f'admin API listening on {self.url}')
+        return self
+
+    def stop(self):
+        """Останавливает сервер."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def add(self, payload):
+        """Добавляет подписку из тела запроса."""
+        if not payload.get('token') or not payload.get('chat_id'):
+            return HTTPStatus.BAD_REQUEST, {
+                'error': 'token and chat_id are required'
+            }
+        subscription = Subscription(payload['token'], payload['chat_id'])
+        added = self.registry.add(subscription)
+        status = HTTPStatus.CREATED if added is subscription else HTTPStatus.OK
+        return status, added.describe()
+
+    def act(self, subscription, action):
+        """Выполняет действие над подпиской."""
+        if action == 'pause':
+            subscription.paused = True
+        elif action == 'resume':
+            subscription.paused = False
+        elif action == 'poll':
+            self.poll(subscription)
+        else:
+            return HTTPStatus.NOT_FOUND, {'error': f'unknown action {action}'}
+        return HTTPStatus.OK, subscription.describe()
+
+    def report_failures(self, method, query):
+        """Возвращает отчёт о сбоях опроса."""
+        if self.failures is None:
+            return HTTPStatus.NOT_FOUND, {'error': 'not found'}
+        if method != 'GET':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'not allowed'}
+        try:
+            limit = max(int(parse_qs(query).get('limit', [0])[0]), 0) or None
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {'error': 'limit must be integer'}
+        return HTTPStatus.OK, self.failures(limit)
+
+    def route(self, method, path, payload, query=''):
+        """Возвращает статус и тело ответа на запрос."""
+        if path.rstrip('/') == FAILURES:
+            return self.report_failures(method, query)
+        parts = [unquote(part) for part in path.split('/') if part]
+        if not parts or f'/{parts[0]}' != PREFIX or len(parts) > 3:
+            return HTTPStatus.NOT_FOUND, {'error': 'not found'}
+        if len(parts) == 1:
+            if method == 'GET':
+                return HTTPStatus.OK, [
+                    subscription.describe() for subscription in self.registry
+                ]
+            if method == 'POST':
+                return self.add(payload)
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'not allowed'}
+        subscription = self.registry.get(parts[1])
+        if subscription is None:
+            return HTTPStatus.NOT_FOUND, {'error': 'unknown subscription'}
+        if len(parts) == 3 and method == 'POST':
+            return self.act(subscription, parts[2])
+        if len(parts) == 2 and method == 'GET':
+            return HTTPStatus.OK, subscription.describe()
+        if len(parts) == 2 and method == 'DELETE':
+            self.registry.remove(subscription.key)
+            return HTTPStatus.OK, subscription.describe()
+        return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'not allowed'}
+
+    def _handler(self):
+        admin = self
+
+        class AdminHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def handle_request(self):
+                if admin.token and self.headers.get(
+                    'Authorization'
+                ) != f'Bearer {admin.token}':
+                    return self.reply(
+                        HTTPStatus.UNAUTHORIZED, {'error': 'unauthorized'}
+                    )
+                length = int(self.headers.get('Content-Length') or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or '{}')
+                except ValueError:
+                    return self.reply(
+                        HTTPStatus.BAD_REQUEST, {'error': 'invalid JSON'}
+                    )
+                url = urlparse(self.path)
+                try:
+                    status, body = admin.route(
+                        self.command, url.path, payload, url.query
+                    )
+                except Exception as error:
+                    logger.error(f'admin request failed: {error}')
+                    status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {
+                        'error': str(error)
+                    }
+                self.reply(status, body)
+
+            do_GET = do_POST = do_DELETE = handle_request
+
+            def reply(self, status, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return AdminHandler
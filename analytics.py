@@ -0,0 +1,175 @@
+"""Статистика ревью по истории смен статусов.
+
+Запуск:
+
+    python analytics.py history.sqlite
+
+Считает медиану времени проверки, долю возвратов по проектам и длину
+очереди на ревью и отправляет сводку в `TELEGRAM_CHAT_ID`.
+"""
+import argparse
+import logging
+import sqlite3
+import statistics
+import time
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from itertools import accumulate, chain, compress, repeat
+from operator import itemgetter
+
+
+logger = logging.getLogger(__name__)
+
+DAY = 24 * 3600
+# Вердикты вместе с предшествующим им взятием на ревью той же работы
+LOAD_REVIEWS = '''
+SELECT homework_name, new_status = 'rejected', changed_at,
+       changed_at - previous_at
+FROM (
+    SELECT homework_name, new_status, changed_at,
+           LAG(new_status) OVER work AS previous_status,
+           LAG(changed_at) OVER work AS previous_at
+    FROM transitions
+    WHERE changed_at >= ?
+    WINDOW work AS (PARTITION BY token, homework_id ORDER BY changed_at)
+)
+WHERE previous_status = 'reviewing'
+  AND new_status IN ('approved', 'rejected')
+'''
+LOAD_STARTS = '''
+SELECT changed_at FROM transitions
+WHERE new_status = 'reviewing' AND changed_at >= ?
+'''
+
+
+def project_name(homework_name):
+    """Возвращает проект по имени работы `логин__проект.zip`."""
+    name = (homework_name or '').split('__', 1)[-1]
+    return name.rsplit('.', 1)[0] or 'unknown'
+
+
+class Reviews:
+    """Проверки работ, разложенные по колонкам-массивам.
+
+    Построчная работа отдана SQLite, колонки собираются транспонированием
+    выборки, а агрегаты считаются встроенными функциями над целыми
+    колонками, без цикла на Python по событиям.
+    """
+
+    def __init__(self, names=(), rejected=(), finished=(), turnaround=(),
+                 started=()):
+        self.names = list(names)
+        self.rejected = array('b', rejected)
+        self.finished = array('q', finished)
+        self.turnaround = array('q', turnaround)
+        self.started = array('q', started)
+
+    def __len__(self):
+        return len(self.turnaround)
+
+    @classmethod
+    def load(cls, path, since=0):
+        """Загружает проверки из базы истории."""
+        connection = sqlite3.connect(path)
+        try:
+            rows = connection.execute(LOAD_REVIEWS, (since,)).fetchall()
+            started = [
+                row[0] for row in connection.execute(LOAD_STARTS, (since,))
+            ]
+        finally:
+            connection.close()
+        return cls(*(zip(*rows) if rows else ((),) * 4), started=started)
+
+    def rejection_rate(self):
+        """Возвращает долю возвратов по проектам."""
+        checked, rejected = Counter(), Counter()
+        by_name = Counter(self.names)
+        rejected_by_name = Counter(compress(self.names, self.rejected))
+        for name, count in by_name.items():
+            project = project_name(name)
+            checked[project] += count
+            rejected[project] += rejected_by_name[name]
+        return {
+            project: rejected[project] / count
+            for project, count in checked.items()
+        }
+
+    def queue(self):
+        """Возвращает моменты событий и длину очереди на ревью после них."""
+        events = sorted(chain(
+            zip(self.started, repeat(1)), zip(self.finished, repeat(-1)),
+        ))
+        moments = array('q', map(itemgetter(0), events))
+        lengths = array('l', accumulate(map(itemgetter(1), events)))
+        return moments, lengths
+
+
+def review_summary(reviews, now=None, days=7):
+    """Считает сводку: время проверки, возвраты и очередь на ревью."""
+    now = time.time() if now is None else now
+    moments, lengths = reviews.queue()
+    by_day = []
+    for day in range(days - 1, -1, -1):
+        position = bisect_right(moments, now - day * DAY)
+        by_day.append(lengths[position - 1] if position else 0)
+    return {
+        'events': len(reviews) + len(reviews.started),
+        'reviews': len(reviews),
+        'median_turnaround': (
+            statistics.median(reviews.turnaround) if len(reviews) else None
+        ),
+        'rejection_rate': reviews.rejection_rate(),
+        'queue_now': lengths[-1] if lengths else 0,
+        'queue_max': max(lengths) if lengths else 0,
+        'queue_by_day': by_day,
+    }
+
+
+def format_summary(summary):
+    """Собирает текст сводки для Telegram."""
+    lines = [
+        f'Статистика ревью: событий {summary["events"]}, '
+        f'проверок {summary["reviews"]}.'
+    ]
+    if summary['median_turnaround'] is not None:
+        hours = summary['median_turnaround'] / 3600
+        lines.append(f'Медиана времени проверки: {hours:.1f} ч.')
+    for project, rate in sorted(summary['rejection_rate'].items()):
+        lines.append(f'{project}: возвратов {rate:.0%}')
+    lines.append(
+        f'Очередь на ревью: сейчас {summary["queue_now"]}, '
+        f'максимум {summary["queue_max"]}, по дням '
+        f'{", ".join(map(str, summary["queue_by_day"]))}.'
+    )
+    return '\n'.join(lines)
+
+
+def main():
+    """Считает статистику и отправляет сводку в Telegram."""
+    import telegram
+
+    import homework as bot_main
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', help='база истории (HISTORY_FILE)')
+    parser.add_argument(
+        '--days', type=int, default=0,
+        help='учитывать только последние дни (0 — всю историю)',
+    )
+    args = parser.parse_args()
+    since = time.time() - args.days * DAY if args.days else 0
+    started = time.perf_counter()
+    summary = review_summary(Reviews.load(args.path, since))
+    logger.info(
+        f'{summary["events"]} events aggregated in '
+        f'{time.perf_counter() - started:.2f} s'
+    )
+    bot = telegram.Bot(token=bot_main.TELEGRAM_TOKEN)
+    if bot_main.TELEGRAM_API_URL:
+        bot.base_url = f'{bot_main.TELEGRAM_API_URL}{bot_main.TELEGRAM_TOKEN}'
+    bot_main.send_message(bot, format_summary(summary))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""Замеры производительности на локальном симуляторе.
+
+Запуск:
+
+    python benchmark.py telegram --concurrency 1 10 100 --latency fixed:0.05
+    python benchmark.py validate --messages 200
+
+`telegram` — сообщений в секунду через Bot API симулятора при разном
+числе одновременных отправок и сколько соединений для этого открыто:
+со стандартным запросом python-telegram-bot и с пулом соединений из
+`telegram_client`. Симулятор работает без TLS, так что цена каждого
+нового соединения в реальной сети здесь не видна.
+
+`validate` — время проверки ответа API из `--messages` работ прежними
+ручными `check_response` и `parse_status` и схемой, собранной
+в `schema.Validator`, на корректном ответе и на испорченных. Сборка
+текста уведомлений одинакова в обоих случаях и в замер не входит.
+"""
+import argparse
+import logging
+import time
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+
+import telegram
+
+from simulator import Simulator
+from telegram_client import configure_bot
+
+
+TOKEN = '1234:benchmark'
+
+
+def send_rate(bot, concurrency, messages):
+    """Отправляет сообщения пачками по `concurrency` одновременных запросов.
+
+    Пачки идут одна за другой, как отправка очереди по циклам опроса.
+    Возвращает число сообщений в секунду.
+    """
+    def send(number):
+        bot.send_message(chat_id=number % 1000 + 1, text=f'message {number}')
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for first in range(0, messages, concurrency):
+            list(executor.map(
+                send, range(first, min(first + concurrency, messages))
+            ))
+    return messages / (time.perf_counter() - started)
+
+
+def bench_telegram(args):
+    """Сравнивает стандартный запрос и пул соединений."""
+    with Simulator(latency=args.latency) as simulator:
+        base_url = simulator.telegram_url
+        print(
+            f'{"concurrency":>11} {"messages":>8} '
+            f'{"default msg/s":>13} {"connections":>11} '
+            f'{"pooled msg/s":>12} {"connections":>11}'
+        )
+        for concurrency in args.concurrency:
+            messages = max(args.messages, concurrency * 5)
+            row = f'{concurrency:>11} {messages:>8}'
+            for bot in (
+                telegram.Bot(token=TOKEN, base_url=base_url),
+                configure_bot(
+                    telegram.Bot(token=TOKEN, base_url=base_url),
+                    pool_size=concurrency,
+                ),
+            ):
+                opened = simulator.stats['telegram_connections']
+                rate = send_rate(bot, concurrency, messages)
+                opened = simulator.stats['telegram_connections'] - opened
+                row += f' {rate:>13.0f} {opened:>11}'
+            print(row)
+
+
+def legacy_check_response(response):
+    """Ручная проверка ответа, как до схемы."""
+    if not isinstance(response, dict):
+        raise TypeError(f'Wrong response type {response}')
+    homework = response.get('homeworks')
+    if 'homeworks' not in response or 'current_date' not in response:
+        raise KeyError(f'{response}')
+    if not isinstance(response['homeworks'], list):
+        raise TypeError(f'homeworks is not a list: {type(homework)}')
+    return homework
+
+
+def legacy_parse_status(homework, verdicts):
+    """Ручная проверка статуса работы, как до схемы, без сборки текста."""
+    if not isinstance(homework, dict):
+        raise TypeError('Homework is not a dict')
+    if 'homework_name' not in homework:
+        raise KeyError('Homework not found')
+    status = homework.get('status')
+    try:
+        verdict = verdicts[status]
+    except KeyError:
+        raise KeyError(f'Status is not recognized{status}')
+    return verdict
+
+
+def validation_payloads(size):
+    """Корректный ответ из `size` работ и его испорченные варианты."""
+    def homework(number):
+        return {
+            'id': number,
+            'homework_name': f'student__hw{number:02d}.zip',
+            'status': ('approved', 'reviewing', 'rejected')[number % 3],
+            'reviewer_comment': '',
+            'date_updated': '2024-01-01T00:00:00Z',
+        }
+
+    homeworks = [homework(number) for number in range(size)]
+    valid = {'homeworks': homeworks, 'current_date': 1700000000}
+    return {
+        'valid': valid,
+        'last unknown': {**valid, 'homeworks': homeworks[:-1] + [
+            {**homeworks[-1], 'status': 'lost'}
+        ]},
+        'every 5th broken': {**valid, 'homeworks': [
+            {'status': 'lost'} if number % 5 == 0 else item
+            for number, item in enumerate(homeworks)
+        ]},
+        'not a list': {'homeworks': {}, 'current_date': 1700000000},
+    }
+
+
+def bench_validate(args):
+    """Сравнивает ручную проверку ответа и скомпилированную схему."""
+    import homework as bot
+
+    def legacy(response):
+        try:
+            for item in legacy_check_response(response):
+                legacy_parse_status(item, bot.HOMEWORK_VERDICTS)
+        except (KeyError, TypeError):
+            pass
+
+    def schema(response):
+        return bot.RESPONSE.problems(response) or bot.HOMEWORKS.problems(
+            response['homeworks']
+        )
+
+    print(
+        f'{"payload":>16} {"legacy us":>10} {"schema us":>10} '
+        f'{"problems":>8}'
+    )
+    for name, response in validation_payloads(args.messages).items():
+        row = f'{name:>16}'
+        for check in (legacy, schema):
+            timer = timeit.Timer(lambda: check(response))
+            number, _ = timer.autorange()
+            best = min(timer.repeat(repeat=5, number=number))
+            row += f' {best / number * 1e6:>10.1f}'
+        print(f'{row} {len(schema(response)):>8}')
+
+
+BENCHMARKS = {'telegram': bench_telegram, 'validate': bench_validate}
+
+
+def main():
+    """Запускает замер из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('benchmark', choices=BENCHMARKS)
+    parser.add_argument(
+        '--concurrency', type=int, nargs='+', default=[1, 10, 100]
+    )
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--latency', default='fixed:0.05')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+    # Стандартный пул python-telegram-bot жалуется на каждое лишнее
+    # соединение
+    logging.getLogger('telegram.vendor.ptb_urllib3.urllib3').setLevel(
+        logging.ERROR
+    )
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Виртуальное время для быстрой симуляции работы бота.
+
+Модули бота берут время через свой глобальный `time`, а компонентам с
+параметром `clock` часы передаются из `main()`. `VirtualClock` повторяет
+нужную часть модуля `time` и подставляется вместо него:
+
+    clock = VirtualClock(until=7 * 24 * 3600)
+    with clock.installed(homework, subscriptions):
+        homework.main()
+
+`sleep` не ждёт, а сразу переводит часы, так что неделя опроса тысяч
+подписок проигрывается за секунды. Когда время доходит до `until`,
+`sleep` бросает `SimulationFinished` и бот штатно завершается.
+"""
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+
+
+class SimulationFinished(BaseException):
+    """Виртуальное время симуляции истекло.
+
+    Наследуется от BaseException, как KeyboardInterrupt: бот перехватывает
+    Exception при опросе, а конец симуляции должен выйти из цикла.
+    """
+
+    pass
+
+
+class VirtualClock:
+    """Детерминированные часы, которые двигает только `sleep`.
+
+    `call_at` планирует вызов на момент виртуального времени: вызовы
+    выполняются по порядку, когда `sleep` или `advance` доходят до них,
+    например чтобы сменить статусы работ в симуляторе или снять замер.
+    """
+
+    def __init__(self, start=1700000000.0, until=None):
+        self.start = start
+        self.until = until
+        self.sleeps = 0
+        self._now = start
+        self._timers = []
+        self._order = itertools.count()
+        self._lock = threading.RLock()
+
+    def time(self):
+        """Возвращает секунды Unix вместо системного времени."""
+        return self._now
+
+    def time_ns(self):
+        """Возвращает наносекунды Unix вместо системного времени."""
+        return int(self._now * 1e9)
+
+    def monotonic(self):
+        """Возвращает секунды от начала симуляции."""
+        return self._now - self.start
+
+    perf_counter = monotonic
+
+    @property
+    def elapsed(self):
+        """Сколько виртуального времени прошло."""
+        return self._now - self.start
+
+    def call_at(self, elapsed, callback):
+        """Планирует `callback()` через `elapsed` секунд от начала."""
+        with self._lock:
+            heapq.heappush(
+                self._timers, (self.start + elapsed, next(self._order),
+                               callback)
+            )
+
+    def advance(self, seconds):
+        """Переводит часы вперёд, выполняя наступившие вызовы."""
+        with self._lock:
+            target = self._now + max(seconds, 0)
+            while self._timers and self._timers[0][0] <= target:
+                when, _, callback = heapq.heappop(self._timers)
+                self._now = max(self._now, when)
+                callback()
+            self._now = target
+
+    def sleep(self, seconds):
+        """Спит `seconds` виртуальных секунд, не задерживая процесс."""
+        self.sleeps += 1
+        if self.until is not None and self.elapsed + seconds > self.until:
+            self.advance(self.until - self.elapsed)
+            raise SimulationFinished(f'simulated {self.until} s')
+        self.advance(seconds)
+
+    @contextmanager
+    def installed(self, *modules):
+        """Подставляет часы вместо модуля `time` в указанных модулях."""
+        previous = [module.time for module in modules]
+        for module in modules:
+            module.time = self
+        try:
+            yield self
+        finally:
+            for module, original in zip(modules, previous):
+                module.time = original
@@ -0,0 +1,77 @@
+import threading
+import time
+
+from exceptions import BudgetExceededError
+from isolation import remaining
+
+
+class _Call:
+    """Выполняющийся или завершённый вызов, общий для всех ожидающих."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.finished_at = None
+
+
+class SingleFlight:
+    """Объединяет одинаковые вызовы в один.
+
+    Пока вызов с ключом выполняется, остальные вызовы с тем же ключом
+    ждут его и получают тот же результат. Успешный результат ещё `ttl`
+    секунд отдаётся без повторного вызова, ошибки не запоминаются.
+    Ожидающие ждут не дольше остатка бюджета своей подписки.
+    """
+
+    def __init__(self, ttl=0, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._results = {}
+
+    def do(self, key, func):
+        """Выполняет `func` или присоединяется к уже идущему вызову."""
+        with self._lock:
+            self._evict()
+            call = self._results.get(key) or self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._in_flight[key] = call
+                self.calls += 1
+        if not leader:
+            if not call.done.wait(remaining()):
+                raise BudgetExceededError(
+                    'shared request did not finish within the budget'
+                )
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result
+
+    def _finish(self, key, call):
+        with self._lock:
+            del self._in_flight[key]
+            if call.error is None and self.ttl > 0:
+                call.finished_at = self.clock()
+                self._results[key] = call
+        call.done.set()
+
+    def _evict(self):
+        deadline = self.clock() - self.ttl
+        expired = [
+            key for key, call in self._results.items()
+            if call.finished_at <= deadline
+        ]
+        for key in expired:
+            del self._results[key]
@@ -0,0 +1,54 @@
+class APIResponseError(Exception):
+    """Исключение для некорректного содержания ответа API."""
+
+    pass
+
+
+class RequestResponseError(Exception):
+    """Исключение для ошибок при запросе."""
+
+    pass
+
+
+class WrongResponseStatusError(Exception):
+    """Исключение для ошибок при запросе."""
+
+    pass
+
+
+class RateLimitedError(WrongResponseStatusError):
+    """Исключение для ответа 429: сервер просит подождать."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class UnauthorizedError(WrongResponseStatusError):
+    """Исключение для ответов 401 и 403: токен недействителен."""
+
+    pass
+
+
+class InsufficientTokensError(Exception):
+    """Исключение для отсутствующих токенов."""
+
+    pass
+
+
+class EmptyListError(Exception):
+    """Исключение при отсутствии элементов в списке."""
+
+    pass
+
+
+class BudgetExceededError(Exception):
+    """Исключение для опроса, не уложившегося в бюджет подписки."""
+
+    pass
+
+
+class MessageRejectedError(Exception):
+    """Исключение для сообщения, которое Telegram отклонил как негодное."""
+
+    pass
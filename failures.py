@@ -0,0 +1,169 @@
+import threading
+import time
+from collections import Counter, deque, namedtuple
+
+
+# Состояния группы ошибок; они же — имена шаблонов сообщений
+FAILURE = 'failure'
+FAILURE_RECOVERED = 'failure_recovered'
+OUTAGE = 'outage'
+OUTAGE_RECOVERED = 'outage_recovered'
+
+# Уведомление о смене состояния: чат подписки или None для чата оператора,
+# текст ошибки, число сбоев и затронутых подписок
+Notice = namedtuple(
+    'Notice', ('state', 'chat_id', 'error', 'count', 'subscriptions')
+)
+# Запись журнала последних ошибок
+Detail = namedtuple('Detail', ('time', 'subscription', 'error', 'message'))
+
+
+def shorten(text, limit):
+    """Обрезает текст до `limit` символов."""
+    if len(text) <= limit:
+        return text
+    return text[:limit - 1] + '…'
+
+
+class _Group:
+    """Сбои одной подписки с одним классом исключения подряд."""
+
+    def __init__(self, subscription, name, now):
+        self.chat_id = subscription.chat_id
+        self.name = name
+        self.first_seen = now
+        self.count = 0
+        self.message = ''
+        self.reported = False
+        # Сообщено ли о сбое сводкой оператору, а не в чат подписки
+        self.outage = False
+
+    def text(self):
+        return f'{self.name}: {self.message}'
+
+
+class FailureTracker:
+    """Группирует сбои опроса по подписке и классу исключения.
+
+    О группе сообщается дважды: при первом сбое и при восстановлении, со
+    счётчиком сбоев за это время; повторы между ними только считаются.
+    Уведомления собираются за цикл: если одной ошибкой сломалось больше
+    `fanout` подписок, это сбой API, и вместо сообщения в каждый чат
+    оператор получает одну сводку. О восстановлении сообщается туда же,
+    куда о сбое: после сбоя API — сводкой оператору, сколько бы подписок
+    ни восстановилось за цикл. Так число сообщений во время сбоя не
+    растёт ни с каждым циклом, ни с числом подписок. Последние `capacity`
+    ошибок с текстом хранятся для просмотра через API администратора.
+    """
+
+    def __init__(self, capacity=100, fanout=3, text_limit=300,
+                 clock=time.time):
+        self.fanout = fanout
+        self.text_limit = text_limit
+        self.clock = clock
+        self.counts = Counter()
+        self._recent = deque(maxlen=capacity)
+        self._groups = {}
+        self._opened = []
+        self._closed = []
+        self._lock = threading.Lock()
+
+    def failed(self, subscription, error):
+        """Учитывает сбой подписки, возвращает True для первого в группе."""
+        now = self.clock()
+        name = type(error).__name__
+        message = shorten(str(error), self.text_limit)
+        with self._lock:
+            groups = self._groups.setdefault(subscription.key, {})
+            group = groups.get(name)
+            first = group is None
+            if first:
+                group = groups[name] = _Group(subscription, name, now)
+                self._opened.append(group)
+            group.count += 1
+            group.message = message
+            self.counts[name] += 1
+            self._recent.append(Detail(now, subscription.key, name, message))
+        return first
+
+    def succeeded(self, subscription):
+        """Закрывает группы сбоев подписки после успешного опроса."""
+        with self._lock:
+            groups = self._groups.pop(subscription.key, None)
+            if groups:
+                self._closed.extend(groups.values())
+
+    def notices(self):
+        """Возвращает уведомления о сменах состояния с прошлого вызова.
+
+        Группы, которые открылись и закрылись между вызовами, не
+        попадают ни в сбои, ни в восстановления.
+        """
+        with self._lock:
+            closed_now = set(map(id, self._closed))
+            opened = [
+                group for group in self._opened
+                if id(group) not in closed_now
+            ]
+            closed = [group for group in self._closed if group.reported]
+            self._opened, self._closed = [], []
+            for group in opened:
+                group.reported = True
+        notices = []
+        for same in self._by_name(opened):
+            if len(same) > self.fanout:
+                for group in same:
+                    group.outage = True
+                notices.append(self._outage(OUTAGE, same))
+            else:
+                notices.extend(self._single(FAILURE, same))
+        for same in self._by_name(closed):
+            outage = [group for group in same if group.outage]
+            if outage:
+                notices.append(self._outage(OUTAGE_RECOVERED, outage))
+            notices.extend(self._single(FAILURE_RECOVERED, [
+                group for group in same if not group.outage
+            ]))
+        return notices
+
+    @staticmethod
+    def _by_name(groups):
+        by_name = {}
+        for group in groups:
+            by_name.setdefault(group.name, []).append(group)
+        return by_name.values()
+
+    @staticmethod
+    def _outage(state, groups):
+        return Notice(
+            state, None, groups[-1].text(),
+            sum(group.count for group in groups), len(groups),
+        )
+
+    @staticmethod
+    def _single(state, groups):
+        return [
+            Notice(state, group.chat_id, group.text(), group.count, 1)
+            for group in groups
+        ]
+
+    def report(self, limit=None):
+        """Возвращает открытые группы, счётчики и последние ошибки."""
+        with self._lock:
+            recent = list(self._recent)[-limit:] if limit else list(
+                self._recent
+            )
+            return {
+                'open': [
+                    {
+                        'subscription': key,
+                        'error': group.text(),
+                        'count': group.count,
+                        'since': group.first_seen,
+                    }
+                    for key, groups in self._groups.items()
+                    for group in groups.values()
+                ],
+                'counts': dict(self.counts),
+                'recent': [detail._asdict() for detail in recent],
+            }
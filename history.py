@@ -0,0 +1,142 @@
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from subscriptions import token_fingerprint
+
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS transitions (
+    token TEXT NOT NULL,
+    homework_id TEXT NOT NULL,
+    homework_name TEXT,
+    old_status TEXT,
+    new_status TEXT NOT NULL,
+    changed_at INTEGER NOT NULL,
+    reviewer_comment TEXT,
+    UNIQUE (token, homework_id, new_status, changed_at)
+);
+CREATE INDEX IF NOT EXISTS transitions_by_status
+    ON transitions (new_status, changed_at);
+CREATE INDEX IF NOT EXISTS transitions_by_homework
+    ON transitions (token, homework_id, changed_at);
+'''
+INSERT = '''
+INSERT OR IGNORE INTO transitions (
+    token, homework_id, homework_name, old_status, new_status, changed_at,
+    reviewer_comment
+) VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+# Время от первого взятия на ревью до принятия по каждой работе
+REVIEW_DURATIONS = '''
+SELECT token, homework_id, homework_name, started, approved,
+       approved - started AS duration
+FROM (
+    SELECT token, homework_id, MAX(homework_name) AS homework_name,
+           MIN(CASE WHEN new_status = 'reviewing' THEN changed_at END)
+               AS started,
+           MAX(CASE WHEN new_status = 'approved' THEN changed_at END)
+               AS approved
+    FROM transitions
+    GROUP BY token, homework_id
+)
+WHERE started IS NOT NULL AND approved >= started
+'''
+
+
+def parse_date(value, default=None):
+    """Переводит `date_updated` из API в метку времени Unix."""
+    try:
+        return int(datetime.strptime(value, DATE_FORMAT).replace(
+            tzinfo=timezone.utc
+        ).timestamp())
+    except (TypeError, ValueError):
+        return int(time.time()) if default is None else default
+
+
+class HistoryStore:
+    """История смен статусов работ во встроенной базе SQLite.
+
+    `record` только кладёт переход в буфер, в базу буфер пишется одной
+    транзакцией в `flush` раз за цикл. Токены хранятся отпечатками.
+    Уникальный ключ (токен, работа, статус, время) делает повторную запись
+    того же перехода, например после перезапуска, безвредной; индексы
+    обслуживают выборки по статусу и по работе в порядке времени.
+    Без пути к файлу хранилище ничего не записывает.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._pending = []
+        self._lock = threading.Lock()
+        self._connection = None
+        if path:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.executescript(SCHEMA)
+
+    def record(self, token, homework, old_status=None):
+        """Запоминает переход работы в новый статус."""
+        if self._connection is None:
+            return
+        row = (
+            token_fingerprint(token),
+            str(homework.get('id', homework.get('homework_name'))),
+            homework.get('homework_name'),
+            old_status,
+            homework.get('status'),
+            parse_date(homework.get('date_updated')),
+            homework.get('reviewer_comment') or None,
+        )
+        with self._lock:
+            self._pending.append(row)
+
+    def flush(self):
+        """Записывает накопленные переходы одной транзакцией."""
+        with self._lock:
+            rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+            with self._connection:
+                self._connection.executemany(INSERT, rows)
+        logger.debug(f'history: {len(rows)} transitions written')
+        return len(rows)
+
+    def _query(self, sql, params=()):
+        self.flush()
+        with self._lock:
+            cursor = self._connection.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def transitions(self, status=None, since=None, until=None, token=None):
+        """Возвращает переходы по фильтрам в порядке времени."""
+        conditions, params = [], []
+        for column, operator, value in (
+            ('new_status', '=', status),
+            ('changed_at', '>=', since),
+            ('changed_at', '<', until),
+            ('token', '=', token and token_fingerprint(token)),
+        ):
+            if value is not None:
+                conditions.append(f'{column} {operator} ?')
+                params.append(value)
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        return self._query(
+            f'SELECT * FROM transitions {where} ORDER BY changed_at', params
+        )
+
+    def review_durations(self):
+        """Возвращает время от начала ревью до принятия по каждой работе."""
+        return self._query(REVIEW_DURATIONS)
+
+    def close(self):
+        """Записывает буфер и закрывает базу."""
+        if self._connection is not None:
+            self.flush()
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,666 @@
+import sys
+import os
+import time
+import json
+import logging
+from collections import namedtuple
+
+import telegram
+
+from dotenv import load_dotenv
+
+import tracing
+
+from admin import AdminServer
+from coalescing import SingleFlight
+from exceptions import (
+    APIResponseError,
+    BudgetExceededError,
+    InsufficientTokensError,
+    MessageRejectedError,
+    RateLimitedError,
+    UnauthorizedError,
+)
+from failures import FailureTracker
+from history import HistoryStore
+from isolation import Bulkhead, remaining
+from lifecycle import CheckpointStore, Lifecycle
+from outbox import Outbox
+from watchdog import CycleWatchdog
+from ratelimit import RateLimiter
+from scheduling import PollScheduler
+from schema import Validator, format_problems
+from snapshot import SnapshotStore
+from subscriptions import ChatBot, Subscription, SubscriptionRegistry
+from telegram_client import bot_pool, configure_bot
+from tokens import TokenManager
+from transport import make_transport
+from warmup import ConnectionWarmer, DNSCache, host_port
+from workers import PollPool, Sender
+
+
+load_dotenv()
+
+PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
+TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
+TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+SUBSCRIPTIONS_FILE = os.getenv('SUBSCRIPTIONS_FILE')
+TEMPLATES_FILE = os.getenv('TEMPLATES_FILE')
+CHECKPOINT_FILE = os.getenv('CHECKPOINT_FILE')
+OUTBOX_FILE = os.getenv('OUTBOX_FILE')
+HISTORY_FILE = os.getenv('HISTORY_FILE')
+SNAPSHOT_FILE = os.getenv('SNAPSHOT_FILE')
+SNAPSHOT_INTERVAL = int(os.getenv('SNAPSHOT_INTERVAL', 60))
+COALESCE_WINDOW = int(os.getenv('COALESCE_WINDOW', 60))
+# Запас, с которым запрос захватывает окно до курсора: изменения, которые
+# сервер записал позже своего current_date, не теряются, а повторы
+# отсекаются по уже известным статусам
+CURSOR_OVERLAP = int(os.getenv('CURSOR_OVERLAP', 60))
+TRACE_FILE = os.getenv('TRACE_FILE')
+TRACE_COLLECTOR_URL = os.getenv('TRACE_COLLECTOR_URL')
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', 1))
+PROFILE_DIR = os.getenv('PROFILE_DIR')
+DRIFT_THRESHOLD = float(os.getenv('DRIFT_THRESHOLD', 0.5))
+# Доля RETRY_PERIOD, отведённая на опрос; что не успело — ждёт цикла
+CYCLE_BUDGET = float(os.getenv('CYCLE_BUDGET', 0.8))
+POLL_QUEUE_LIMIT = int(os.getenv('POLL_QUEUE_LIMIT', 1000))
+# Сколько подписок опрашивается одновременно; 1 — без пула потоков
+POLL_WORKERS = int(os.getenv('POLL_WORKERS', 1))
+ADMIN_PORT = os.getenv('ADMIN_PORT')
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+TOKEN_QUARANTINE = int(os.getenv('TOKEN_QUARANTINE', 600))
+# Сколько подписок может сломаться одной ошибкой, прежде чем вместо
+# сообщений в их чаты оператору уйдёт одна сводка о сбое
+FAILURE_FANOUT = int(os.getenv('FAILURE_FANOUT', 3))
+FAILURE_LOG_SIZE = int(os.getenv('FAILURE_LOG_SIZE', 100))
+# Бюджет времени на опрос одной подписки, число одновременных опросов
+# одной подписки и наибольшая пауза в её опросе после сбоев подряд
+SUBSCRIPTION_TIMEOUT = float(os.getenv('SUBSCRIPTION_TIMEOUT', 20))
+SUBSCRIPTION_IN_FLIGHT = int(os.getenv('SUBSCRIPTION_IN_FLIGHT', 1))
+SUBSCRIPTION_BACKOFF_MAX = int(os.getenv('SUBSCRIPTION_BACKOFF_MAX', 3600))
+
+RETRY_PERIOD = 600
+ENDPOINT = os.getenv(
+    'PRACTICUM_ENDPOINT',
+    'https://practicum.yandex.ru/api/user_api/homework_statuses/',
+)
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL')
+# Пул соединений с Bot API и число одновременных отправок в разные чаты
+TELEGRAM_POOL_SIZE = int(os.getenv('TELEGRAM_POOL_SIZE', 8))
+TELEGRAM_CONCURRENCY = int(os.getenv('TELEGRAM_CONCURRENCY', 8))
+TELEGRAM_CONNECT_TIMEOUT = float(os.getenv('TELEGRAM_CONNECT_TIMEOUT', 5))
+TELEGRAM_READ_TIMEOUT = float(os.getenv('TELEGRAM_READ_TIMEOUT', 5))
+# За сколько секунд до цикла освежать DNS и открывать соединения (0 —
+# не прогревать), сколько секунд хранить ответы DNS и сколько ещё
+# пользоваться устаревшим ответом, пока DNS недоступен
+WARMUP_LEAD = float(os.getenv('WARMUP_LEAD', 0))
+DNS_TTL = int(os.getenv('DNS_TTL', 300))
+DNS_MAX_STALE = int(os.getenv('DNS_MAX_STALE', 3600))
+HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+# Один ограничитель на все запросы к API, сколько бы ни было подписок.
+# Часы читаются через модуль при каждом вызове, чтобы их можно было
+# подменить виртуальными (clock.VirtualClock)
+RATE_LIMITER = RateLimiter.from_env(
+    clock=lambda: time.monotonic(), sleep=lambda seconds: time.sleep(seconds)
+)
+TRANSPORT = make_transport(os.getenv('PRACTICUM_TRANSPORT', 'requests'))
+# Проверенные токены и их заголовки; отвергнутые API ждут в карантине
+TOKENS = TokenManager(
+    probe=lambda headers: request_homework_statuses(
+        headers, int(time.time())
+    ),
+    quarantine=TOKEN_QUARANTINE,
+    clock=lambda: time.time(),
+)
+
+HOMEWORK_VERDICTS = {
+    'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
+    'reviewing': 'Работа взята на проверку ревьюером.',
+    'rejected': 'Работа проверена: у ревьюера есть замечания.'
+}
+MESSAGE_TEMPLATES = {
+    'status_changed': (
+        'Изменился статус проверки работы "{homework_name}". {verdict}'
+    ),
+    'failure': 'Сбой в работе программы: {error}',
+    'failure_recovered': (
+        'Работа восстановлена, сбоев подряд: {count}. Последний: {error}'
+    ),
+    'outage': 'Сбой в работе программы у {subscriptions} подписок: {error}',
+    'outage_recovered': (
+        'Работа восстановлена у {subscriptions} подписок, сбоев за время '
+        'простоя: {count}'
+    ),
+    'lagging': (
+        'Бот не успевает опрашивать подписки: цикл занял {duration:.0f} с, '
+        'начался с опозданием {lag:.0f} с при периоде {period} с.'
+    ),
+    'recovered': 'Бот снова успевает опрашивать подписки по расписанию.',
+    'token_rejected': (
+        'API Практикума отклонил токен подписки, опрос приостановлен: '
+        '{error}'
+    ),
+}
+
+# Схема ответа API: проверка собирается один раз при импорте, вердикты
+# проверяются по словарю HOMEWORK_VERDICTS вместе с дополненными из файла.
+# Ответ целиком проверяется строго, а каждая работа — отдельно, чтобы
+# одна некорректная работа не задерживала остальные
+HOMEWORK_SCHEMA = {
+    'type': dict,
+    'fields': {
+        'homework_name': {'type': str},
+        'status': {'type': str, 'choices': HOMEWORK_VERDICTS},
+    },
+}
+RESPONSE_SCHEMA = {
+    'type': dict,
+    'missing': APIResponseError,
+    'fields': {
+        'homeworks': {'type': list},
+        'current_date': {'type': int},
+    },
+}
+HOMEWORK = Validator(HOMEWORK_SCHEMA)
+HOMEWORKS = Validator({'type': list, 'items': HOMEWORK_SCHEMA})
+RESPONSE = Validator(RESPONSE_SCHEMA)
+
+# Компоненты одного запуска бота, общие для всех циклов опроса
+Runtime = namedtuple('Runtime', (
+    'bot', 'registry', 'flights', 'outbox', 'checkpoints', 'scheduler',
+    'watchdog', 'pool', 'sender', 'history', 'snapshots', 'failures',
+    'bulkhead',
+))
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+handler = logging.StreamHandler()
+handler.setStream(sys.stdout)
+# Обработчик на корневом логгере, чтобы видеть и логи вспомогательных модулей
+logging.getLogger().addHandler(handler)
+logging.getLogger().setLevel(logging.INFO)
+formatter = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+handler.setFormatter(formatter)
+
+
+def check_tokens():
+    """Проверяет доступность переменных окружения."""
+    tokens = {
+        'PRACTICUM_TOKEN': PRACTICUM_TOKEN,
+        'TELEGRAM_TOKEN': TELEGRAM_TOKEN,
+        'TELEGRAM_CHAT_ID': TELEGRAM_CHAT_ID
+    }
+    missing_tokens = []
+    for key, value in tokens.items():
+        if not value:
+            logger.critical(f'Insufficient token: {key}')
+            missing_tokens.append(key)
+    if not missing_tokens:
+        return True
+    return False
+
+
+def send_message(bot, message):
+    """Отправляет сообщение в Telegram чат.
+
+    Возвращает False, если отправку стоит повторить. Сообщение, которое
+    Telegram отклонил (`BadRequest`), повторять бесполезно: для него
+    поднимается `MessageRejectedError`.
+    """
+    try:
+        bot.send_message(
+            # Бот подписки знает свой чат, общий бот пишет в чат из окружения
+            chat_id=getattr(bot, 'chat_id', TELEGRAM_CHAT_ID),
+            text=message,
+        )
+        logger.debug('message sent successfully')
+    except telegram.error.BadRequest as error:
+        logger.error(f'message rejected by Telegram: {error}')
+        raise MessageRejectedError(str(error)) from error
+    except Exception as error:
+        # Ожидаемый сбой сети или Bot API: трассировка раздувала бы лог
+        # при каждом повторе очереди во время сбоя Telegram
+        logger.error(f'message not sent: {error}')
+        return False
+    return True
+
+
+def request_homework_statuses(headers, timestamp):
+    """Делает запрос к API с заголовками конкретной подписки.
+
+    При опросе подписки ожидание в ограничителе и тайм-аут запроса не
+    выходят за остаток её бюджета времени.
+    """
+    limiter_key = headers['Authorization']
+    RATE_LIMITER.acquire(limiter_key, max_wait=remaining())
+    try:
+        with tracing.span('practicum.request', from_date=timestamp):
+            return TRANSPORT.get_json(
+                ENDPOINT, headers=headers, params={'from_date': timestamp},
+                timeout=remaining(),
+            )
+    except RateLimitedError as error:
+        RATE_LIMITER.retry_after(limiter_key, error.retry_after)
+        raise
+
+
+def get_api_answer(timestamp):
+    """Делает запрос к API."""
+    return request_homework_statuses(HEADERS, timestamp)
+
+
+def check_response(response):
+    """Проверяет ответ API на соответствие документации."""
+    return RESPONSE.ensure(response)['homeworks']
+
+
+def valid_homeworks(homeworks):
+    """Возвращает работы, прошедшие проверку; остальные пишет в лог."""
+    # Обычно корректны все работы, и хватает одного предиката на список
+    if not HOMEWORKS.problems(homeworks):
+        return homeworks
+    valid = []
+    for index, homework in enumerate(homeworks):
+        problems = HOMEWORK.problems(homework)
+        if problems:
+            logger.warning(
+                f'homeworks[{index}] skipped: {format_problems(problems)}'
+            )
+        else:
+            valid.append(homework)
+    return valid
+
+
+def parse_status(homework):
+    """Извлекает статус домашней работы."""
+    return format_status(HOMEWORK.ensure(homework))
+
+
+def format_status(homework):
+    """Собирает сообщение о статусе уже проверенной работы."""
+    verdict = HOMEWORK_VERDICTS[homework['status']]
+    if verdict == 'rejected':
+        return homework.get('reviewer_comment')
+    return MESSAGE_TEMPLATES['status_changed'].format(
+        homework_name=homework['homework_name'],
+        verdict=verdict,
+    )
+
+
+def fetch_homeworks(subscription, flights):
+    """Получает работы подписки, разделяя запрос с подписками того же токена.
+
+    `from_date` отступает от курсора на `CURSOR_OVERLAP` и округляется вниз
+    до окна объединения: подписки одного токена с близкими курсорами
+    получают один общий ответ, а не отдельные запросы. Возвращает список
+    работ и `current_date` ответа.
+    """
+    # Подписка без курсора опрашивается с текущего момента, как при старте
+    cursor = subscription.cursor
+    if cursor is None:
+        cursor = subscription.cursor = int(time.time())
+    from_date = max(cursor - CURSOR_OVERLAP, 0)
+    from_date -= from_date % COALESCE_WINDOW
+    headers = TOKENS.headers(subscription.token)
+
+    def fetch():
+        response = request_homework_statuses(headers, from_date)
+        with tracing.span('check_response'):
+            homeworks = valid_homeworks(check_response(response))
+        return homeworks, response['current_date']
+
+    return flights.do((headers['Authorization'], from_date), fetch)
+
+
+def notification_key(subscription, homework):
+    """Ключ идемпотентности уведомления о статусе работы."""
+    return ':'.join(str(part) for part in (
+        subscription.key,
+        homework.get('id', homework.get('homework_name')),
+        homework.get('status'),
+        homework.get('date_updated'),
+    ))
+
+
+def notify_status(subscription, homework, outbox, history=None):
+    """Ставит уведомление о новом статусе в очередь и пишет его в историю."""
+    # Ответ уже проверен схемой целиком, остаётся собрать текст
+    with tracing.span('parse_status'):
+        message = format_status(homework)
+    previous = subscription.status_of(homework)
+    # Окна запросов перекрываются, уже отправленное не повторяем
+    if not subscription.remember_status(homework):
+        return
+    outbox.put(
+        subscription.chat_id,
+        message,
+        key=notification_key(subscription, homework),
+    )
+    if history is not None:
+        history.record(subscription.token, homework, previous)
+
+
+def poll_subscription(subscription, flights, outbox, history=None,
+                      failures=None):
+    """Опрашивает API по подписке и ставит новый статус в очередь её чата.
+
+    Со сборщиком сбоев `failures` о сбое сообщает он, один раз на группу;
+    без него сообщение о сбое ставится в очередь при каждом. Возвращает
+    True после успешного опроса, False после сбоя и None, если опрос
+    отложен: токен в карантине или не хватило бюджета времени.
+    """
+    try:
+        if not TOKENS.usable(subscription.token):
+            subscription.last_error = 'token is quarantined'
+            return None
+        homework_list, current_date = fetch_homeworks(subscription, flights)
+        if not homework_list:
+            logger.debug('No new statuses found')
+        # После долгой паузы в ответе бывает несколько изменений: сообщаем
+        # обо всех, от старых к новым
+        for homework in reversed(homework_list):
+            notify_status(subscription, homework, outbox, history)
+        # Курсор берётся по часам сервера и сдвигается только вперёд и
+        # только после успешного опроса: ни сбой, ни долгий цикл, ни общий
+        # закэшированный ответ не теряют обновлений
+        subscription.cursor = max(subscription.cursor or 0, current_date)
+        subscription.last_error = None
+        TOKENS.accept(subscription.token)
+        if failures is not None:
+            failures.succeeded(subscription)
+        return True
+    except BudgetExceededError as error:
+        # Подписка подождёт следующего цикла, остальные не ждут её
+        subscription.last_error = str(error)
+        logger.warning(f'poll of {subscription.key} deferred: {error}')
+    except UnauthorizedError as error:
+        # Об отозванном токене сообщаем один раз, а не каждый цикл
+        subscription.last_error = str(error)
+        if TOKENS.reject(subscription.token, error):
+            outbox.put(
+                subscription.chat_id,
+                MESSAGE_TEMPLATES['token_rejected'].format(error=error),
+            )
+    except Exception as error:
+        report_poll_error(subscription, error, outbox, failures)
+        return False
+    return None
+
+
+def report_poll_error(subscription, error, outbox, failures=None):
+    """Запоминает и логирует сбой опроса, сообщает о нём в чат подписки."""
+    subscription.last_error = str(error)
+    if failures is None:
+        first = True
+        outbox.put(
+            subscription.chat_id,
+            MESSAGE_TEMPLATES['failure'].format(error=error),
+        )
+    else:
+        first = failures.failed(subscription, error)
+    # В ошибке проверки схемы уже перечислены все проблемы ответа,
+    # трассировка стека к ним ничего не добавляет; повторы той же ошибки
+    # пишутся без неё
+    logger.error(error, exc_info=first and not hasattr(error, 'problems'))
+
+
+def deliver_outbox(bot, outbox):
+    """Отправляет в Telegram накопившиеся в очереди сообщения."""
+    def send(chat_id, text):
+        with tracing.span('telegram.send', chat_id=chat_id):
+            return send_message(ChatBot(bot, chat_id), text)
+
+    return outbox.drain(send)
+
+
+def poll_one(runtime, subscription):
+    """Опрашивает подписку в её отсеке и отмечает это в планировщике.
+
+    Если подписка уже опрашивается, например по запросу из API
+    управления, она отбрасывается до следующего цикла.
+    """
+    def poll(subscription):
+        with tracing.span('poll', subscription=subscription.key):
+            return poll_subscription(
+                subscription, runtime.flights, runtime.outbox,
+                runtime.history, runtime.failures,
+            )
+
+    if not runtime.bulkhead.run(subscription, poll):
+        runtime.scheduler.shed([subscription])
+        return
+    runtime.scheduler.polled(subscription)
+    if runtime.sender is not None:
+        runtime.sender.notify()
+
+
+def report_failures(runtime):
+    """Ставит в очередь уведомления о новых сбоях и восстановлениях."""
+    for notice in runtime.failures.notices():
+        runtime.outbox.put(
+            notice.chat_id or TELEGRAM_CHAT_ID,
+            MESSAGE_TEMPLATES[notice.state].format(**notice._asdict()),
+        )
+
+
+def deliver(runtime):
+    """Отправляет очередь сам или будит поток отправки, если он есть."""
+    if runtime.sender is not None:
+        runtime.sender.notify()
+    else:
+        deliver_outbox(runtime.bot, runtime.outbox)
+
+
+def run_cycle(runtime):
+    """Опрашивает подписки по приоритету и отправляет накопившееся.
+
+    На опрос отводится `CYCLE_BUDGET` от периода: подписки, до которых
+    очередь не дошла, отбрасываются до следующего цикла, так что работы на
+    ревью не ждут за спящими аккаунтами.
+    """
+    deadline = time.monotonic() + CYCLE_BUDGET * RETRY_PERIOD
+    queue = runtime.scheduler.plan(
+        runtime.registry, overloaded=runtime.watchdog.overloaded
+    )
+    runtime.scheduler.shed(runtime.pool.run(
+        queue, lambda subscription: poll_one(runtime, subscription), deadline
+    ))
+    report_failures(runtime)
+    # Курсоры сохраняются только после записи сообщений на диск
+    runtime.outbox.flush()
+    runtime.history.flush()
+    runtime.checkpoints.save(runtime.registry.cursors())
+    runtime.snapshots.maybe_save(runtime.registry, runtime.outbox)
+    deliver(runtime)
+
+
+def poll_now(runtime, subscription):
+    """Опрашивает подписку вне очереди и сразу отправляет уведомления."""
+    poll_one(runtime, subscription)
+    report_failures(runtime)
+    runtime.outbox.flush()
+    deliver(runtime)
+
+
+def report_lag(runtime):
+    """Сообщает оператору, что бот отстал от расписания или догнал его."""
+    state = runtime.watchdog.cycle_finished()
+    if state:
+        runtime.outbox.put(
+            TELEGRAM_CHAT_ID,
+            MESSAGE_TEMPLATES[state].format(**runtime.watchdog.report()),
+        )
+        deliver(runtime)
+
+
+def guarded(step, *args):
+    """Выполняет шаг цикла, сбой которого не должен останавливать бота.
+
+    Ошибка записи на диск или в базу только логируется: следующий цикл
+    или следующий шаг остановки выполняются как обычно.
+    """
+    try:
+        return step(*args)
+    except Exception as error:
+        logger.error(f'{step.__qualname__} failed: {error}', exc_info=True)
+
+
+def shutdown(runtime):
+    """Досылает очередь сообщений и сохраняет курсоры перед выходом."""
+    guarded(runtime.pool.shutdown)
+    if runtime.sender is not None:
+        guarded(runtime.sender.stop)
+    guarded(deliver_outbox, runtime.bot, runtime.outbox)
+    guarded(runtime.outbox.close)
+    guarded(runtime.history.close)
+    guarded(runtime.checkpoints.save, runtime.registry.cursors())
+    guarded(runtime.snapshots.save, runtime.registry, runtime.outbox)
+
+
+def make_warmer(bot):
+    """Собирает прогрев соединений с API Практикума и Bot API."""
+    # Адрес по умолчанию тот же, что у python-telegram-bot
+    telegram_url = TELEGRAM_API_URL or 'https://api.telegram.org/bot'
+    dns = DNSCache(
+        [host_port(ENDPOINT)[0], host_port(telegram_url)[0]],
+        ttl=DNS_TTL,
+        max_stale=DNS_MAX_STALE,
+        clock=time.monotonic,
+    )
+    return ConnectionWarmer(
+        [
+            (lambda: TRANSPORT.pool(ENDPOINT), POLL_WORKERS),
+            (lambda: bot_pool(bot), 1),
+        ],
+        dns=dns,
+        lead=WARMUP_LEAD,
+        clock=time.monotonic,
+    )
+
+
+def load_templates(path):
+    """Загружает вердикты и шаблоны сообщений из файла."""
+    if not path or not os.path.exists(path):
+        return
+    with open(path, encoding='utf-8') as file:
+        templates = json.load(file)
+    HOMEWORK_VERDICTS.update(templates.get('verdicts', {}))
+    MESSAGE_TEMPLATES.update(templates.get('messages', {}))
+
+
+def reload_config(registry):
+    """Перечитывает подписки и шаблоны сообщений без перезапуска."""
+    try:
+        load_dotenv(override=True)
+        registry.default = Subscription(
+            os.getenv('PRACTICUM_TOKEN'), os.getenv('TELEGRAM_CHAT_ID')
+        )
+        registry.reload()
+        registry.restore_cursors({}, default=int(time.time()))
+        load_templates(TEMPLATES_FILE)
+    except (OSError, ValueError, KeyError) as error:
+        logger.error(f'config reload failed, keeping old one: {error}')
+
+
+def main():
+    """Основная логика работы бота."""
+    if not check_tokens():
+        raise InsufficientTokensError('Insufficient tokens')
+    bot = telegram.Bot(token=TELEGRAM_TOKEN)
+    configure_bot(
+        bot,
+        pool_size=TELEGRAM_POOL_SIZE,
+        connect_timeout=TELEGRAM_CONNECT_TIMEOUT,
+        read_timeout=TELEGRAM_READ_TIMEOUT,
+    )
+    if TELEGRAM_API_URL:
+        # Например, локальный симулятор Bot API из simulator.py
+        bot.base_url = f'{TELEGRAM_API_URL}{TELEGRAM_TOKEN}'
+    load_templates(TEMPLATES_FILE)
+    tracer = tracing.configure(
+        TRACE_FILE, TRACE_COLLECTOR_URL, TRACE_SAMPLE_RATE
+    )
+    if PROFILE_DIR:
+        tracing.ProfilerToggle(PROFILE_DIR).install()
+    registry = SubscriptionRegistry(
+        default=Subscription(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID),
+        path=SUBSCRIPTIONS_FILE,
+    )
+    outbox = Outbox(
+        OUTBOX_FILE, concurrency=TELEGRAM_CONCURRENCY, clock=time.time
+    )
+    # Снимок возвращает курсоры вместе со статусами и очередью, курсоры
+    # остальных подписок берутся из контрольной точки
+    snapshots = SnapshotStore(
+        SNAPSHOT_FILE, interval=SNAPSHOT_INTERVAL, clock=time.monotonic
+    )
+    snapshots.restore(registry, outbox)
+    checkpoints = CheckpointStore(CHECKPOINT_FILE)
+    registry.restore_cursors(checkpoints.load(), default=int(time.time()))
+    runtime = Runtime(
+        bot=bot,
+        registry=registry,
+        flights=SingleFlight(ttl=COALESCE_WINDOW, clock=time.monotonic),
+        outbox=outbox,
+        checkpoints=checkpoints,
+        scheduler=PollScheduler(capacity=POLL_QUEUE_LIMIT, clock=time.time),
+        watchdog=CycleWatchdog(
+            RETRY_PERIOD, DRIFT_THRESHOLD, clock=time.monotonic
+        ),
+        pool=PollPool(POLL_WORKERS, clock=time.monotonic),
+        # С пулом потоков в Telegram пишет один поток отправки
+        sender=Sender(lambda: deliver_outbox(bot, outbox)).start()
+        if POLL_WORKERS > 1 else None,
+        history=HistoryStore(HISTORY_FILE),
+        snapshots=snapshots,
+        failures=FailureTracker(
+            capacity=FAILURE_LOG_SIZE, fanout=FAILURE_FANOUT, clock=time.time
+        ),
+        bulkhead=Bulkhead(
+            timeout=SUBSCRIPTION_TIMEOUT,
+            in_flight=SUBSCRIPTION_IN_FLIGHT,
+            backoff_base=RETRY_PERIOD,
+            backoff_max=SUBSCRIPTION_BACKOFF_MAX,
+            clock=time.time,
+        ),
+    )
+    admin = None
+    if ADMIN_PORT:
+        admin = AdminServer(
+            registry,
+            lambda subscription: poll_now(runtime, subscription),
+            port=int(ADMIN_PORT),
+            token=ADMIN_TOKEN,
+            failures=runtime.failures.report,
+        ).start()
+    warmer = make_warmer(bot).start()
+    lifecycle = Lifecycle()
+    lifecycle.install()
+    try:
+        while not lifecycle.stop_requested:
+            if lifecycle.reload_requested:
+                lifecycle.reload_requested = False
+                reload_config(registry)
+            runtime.watchdog.cycle_started()
+            guarded(run_cycle, runtime)
+            guarded(report_lag, runtime)
+            if lifecycle.stop_requested:
+                break
+            warmer.schedule(time.monotonic() + RETRY_PERIOD)
+            with lifecycle.sleeping() as may_sleep:
+                if may_sleep:
+                    time.sleep(RETRY_PERIOD)
+    finally:
+        lifecycle.uninstall()
+        warmer.stop()
+        if admin is not None:
+            admin.stop()
+        shutdown(runtime)
+        tracer.shutdown()
+        logger.info('bot stopped')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+from collections import Counter
+
+from exceptions import BudgetExceededError
+
+
+logger = logging.getLogger(__name__)
+
+# Срок бюджета подписки, которую опрашивает текущий поток
+_budget = threading.local()
+
+
+def remaining():
+    """Сколько секунд осталось у бюджета текущей подписки, или None."""
+    deadline = getattr(_budget, 'deadline', None)
+    if deadline is None:
+        return None
+    left = deadline - _budget.clock()
+    if left <= 0:
+        raise BudgetExceededError('subscription time budget is exhausted')
+    return left
+
+
+class Bulkhead:
+    """Изолирует опрос подписок друг от друга.
+
+    У каждой подписки свой бюджет времени `timeout` на опрос: запрос к API
+    получает тайм-аут не больше остатка (`remaining`), а ожидание сверх
+    остатка не начинается, и подписка просто ждёт следующего цикла. Одна
+    подписка одновременно опрашивается не больше `in_flight` раз, например
+    циклом и по запросу из API управления; подписки одного токена
+    разделяют запрос через `SingleFlight`, а ждут его в пределах своего
+    бюджета, так что зависший токен не держит их дольше. Исключения
+    опроса не выходят за пределы подписки, а после второго сбоя подряд
+    подписка опрашивается реже: пауза удваивается от `backoff_base` до
+    `backoff_max` секунд. Остальные подписки опрашиваются как обычно.
+    """
+
+    def __init__(self, timeout=20, in_flight=1, backoff_base=600,
+                 backoff_max=3600, clock=time.time):
+        self.timeout = timeout
+        self.in_flight = in_flight
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.clock = clock
+        self.rejected = 0
+        self._running = Counter()
+        self._lock = threading.Lock()
+
+    def _enter(self, key):
+        with self._lock:
+            if self._running[key] >= self.in_flight:
+                self.rejected += 1
+                return False
+            self._running[key] += 1
+            return True
+
+    def _leave(self, key):
+        with self._lock:
+            self._running[key] -= 1
+            if not self._running[key]:
+                del self._running[key]
+
+    def run(self, subscription, poll):
+        """Опрашивает подписку через `poll` в пределах её бюджета.
+
+        `poll` возвращает True при успешном опросе, False при сбое и None,
+        если опрос отложен. Возвращает False, если квота подписки занята и
+        опрос не начинался.
+        """
+        if not self._enter(subscription.key):
+            return False
+        _budget.deadline = self.clock() + self.timeout
+        _budget.clock = self.clock
+        try:
+            succeeded = poll(subscription)
+        except Exception as error:
+            logger.error(
+                f'subscription {subscription.key} failed: {error}',
+                exc_info=True,
+            )
+            subscription.last_error = str(error)
+            succeeded = False
+        finally:
+            _budget.deadline = None
+            self._leave(subscription.key)
+        self.record(subscription, succeeded)
+        return True
+
+    def record(self, subscription, succeeded):
+        """Обновляет счётчик сбоев подписки и паузу перед её опросом."""
+        if succeeded is None:
+            return
+        if succeeded:
+            subscription.failures = 0
+            subscription.retry_at = 0
+            return
+        subscription.failures += 1
+        if subscription.failures > 1:
+            delay = min(
+                self.backoff_base * 2 ** (subscription.failures - 2),
+                self.backoff_max,
+            )
+            subscription.retry_at = self.clock() + delay
+            logger.warning(
+                f'subscription {subscription.key} failed '
+                f'{subscription.failures} times in a row, next poll in '
+                f'{delay:.0f}s'
+            )
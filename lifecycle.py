@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+import signal
+from contextlib import contextmanager
+
+
+logger = logging.getLogger(__name__)
+
+
+class ShutdownInterrupt(Exception):
+    """Прерывает ожидание между опросами при остановке бота."""
+
+    pass
+
+
+class Lifecycle:
+    """Обрабатывает сигналы остановки и перезагрузки конфигурации.
+
+    Сигнал остановки, пришедший во время запроса или отправки, только
+    выставляет флаг: текущий цикл доводится до конца. Во время ожидания
+    между опросами сигнал прерывает сон сразу.
+    """
+
+    STOP_SIGNALS = ('SIGTERM', 'SIGINT')
+    RELOAD_SIGNALS = ('SIGHUP',)
+
+    def __init__(self):
+        self.stop_requested = False
+        self.reload_requested = False
+        self._sleeping = False
+        self._previous = {}
+
+    def install(self):
+        """Устанавливает обработчики сигналов."""
+        handlers = dict.fromkeys(self.STOP_SIGNALS, self._on_stop)
+        handlers.update(dict.fromkeys(self.RELOAD_SIGNALS, self._on_reload))
+        for name, handler in handlers.items():
+            signum = getattr(signal, name, None)
+            if signum is None:
+                continue
+            try:
+                self._previous[signum] = signal.signal(signum, handler)
+            except ValueError:
+                # Обработчики можно ставить только из главного потока
+                logger.warning(f'cannot handle {name} outside main thread')
+
+    def uninstall(self):
+        """Возвращает прежние обработчики сигналов."""
+        for signum, handler in self._previous.items():
+            signal.signal(signum, handler)
+        self._previous.clear()
+
+    def _on_stop(self, signum, frame):
+        logger.info(f'received {signal.Signals(signum).name}, stopping')
+        self.stop_requested = True
+        if self._sleeping:
+            raise ShutdownInterrupt
+
+    def _on_reload(self, signum, frame):
+        logger.info(f'received {signal.Signals(signum).name}, reloading')
+        self.reload_requested = True
+
+    @contextmanager
+    def sleeping(self):
+        """Отмечает ожидание, которое можно прервать сигналом остановки.
+
+        Отдаёт False, если остановка уже запрошена: сигнал мог прийти
+        после последней проверки, но до входа в ожидание, и тогда спать
+        не нужно. Сигнал, пришедший позже, прерывает блок.
+        """
+        self._sleeping = True
+        try:
+            yield not self.stop_requested
+        except ShutdownInterrupt:
+            pass
+        finally:
+            self._sleeping = False
+
+
+class CheckpointStore:
+    """Сохраняет курсоры подписок в файл между запусками."""
+
+    def __init__(self, path=None):
+        self.path = path
+
+    def load(self):
+        """Читает курсоры из файла контрольной точки."""
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError) as error:
+            logger.error(f'checkpoint is not readable: {error}')
+            return {}
+
+    def save(self, cursors):
+        """Атомарно записывает курсоры в файл контрольной точки."""
+        if not self.path:
+            return
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(cursors, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
@@ -0,0 +1,324 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from exceptions import MessageRejectedError
+
+
+logger = logging.getLogger(__name__)
+
+# Ограничение Telegram на длину одного сообщения
+MESSAGE_LIMIT = 4096
+MESSAGE_SEPARATOR = '\n\n'
+
+
+def split_text(text, limit=MESSAGE_LIMIT):
+    """Делит текст на части не длиннее `limit`, по строкам, если можно."""
+    parts = []
+    while len(text) > limit:
+        cut = text.rfind('\n', 0, limit + 1)
+        if cut <= 0:
+            cut = limit
+        parts.append(text[:cut])
+        text = text[cut:].lstrip('\n')
+    parts.append(text)
+    return parts
+
+
+class OutboxMessage:
+    """Сообщение, ожидающее отправки в чат."""
+
+    def __init__(self, key, chat_id, text, attempts=0, next_attempt=0):
+        self.key = key
+        self.chat_id = str(chat_id)
+        self.text = text
+        self.attempts = attempts
+        self.next_attempt = next_attempt
+
+    def to_record(self):
+        """Возвращает запись для журнала."""
+        return {
+            'op': 'put',
+            'key': self.key,
+            'chat_id': self.chat_id,
+            'text': self.text,
+        }
+
+
+class Outbox:
+    """Очередь исходящих сообщений с журналом упреждающей записи.
+
+    Сообщение сначала дописывается в журнал и только потом отправляется,
+    после отправки в журнал пишется подтверждение. При старте журнал
+    проигрывается заново, так что неподтверждённые сообщения переживают
+    перезапуск: доставка как минимум однократная. Ключ идемпотентности не
+    даёт поставить одно и то же сообщение дважды, в том числе после сжатия
+    журнала и перезапуска. Текст длиннее лимита Telegram ставится частями,
+    а сообщение, которое Telegram отклонил, отбрасывается без повторов.
+    Журнал сбрасывается на диск одним `fsync` за цикл, а сжимается в
+    фоновом потоке.
+    """
+
+    def __init__(self, path=None, max_attempts=100, retry_base=1,
+                 retry_max=3600, compact_after=1000, remember=10000,
+                 concurrency=1, clock=time.time):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.compact_after = compact_after
+        self.concurrency = concurrency
+        self.clock = clock
+        self._pending = OrderedDict()
+        self._delivered = OrderedDict()
+        self._remember = remember
+        self._records = 0
+        self._lock = threading.RLock()
+        # Отправка идёт без общей блокировки, но одновременно — одна
+        self._drain_lock = threading.Lock()
+        self._compacting = False
+        self._compaction = None
+        self._file = None
+        if path:
+            self._replay()
+            self._file = open(path, 'a', encoding='utf-8')
+
+    def __len__(self):
+        return len(self._pending)
+
+    def pending(self):
+        """Возвращает неотправленные сообщения в порядке постановки."""
+        with self._lock:
+            return list(self._pending.values())
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Оборванная при сбое последняя строка
+                    logger.warning('skipping broken outbox record')
+                    continue
+                self._apply(record)
+                self._records += 1
+        logger.info(f'outbox restored: {len(self._pending)} pending')
+
+    def _apply(self, record):
+        if record['op'] == 'put':
+            self._pending[record['key']] = OutboxMessage(
+                record['key'], record['chat_id'], record['text']
+            )
+        else:
+            self._pending.pop(record['key'], None)
+            self._remember_delivered(record['key'])
+
+    def _remember_delivered(self, key):
+        self._delivered[key] = True
+        if len(self._delivered) > self._remember:
+            self._delivered.popitem(last=False)
+
+    def _write(self, record):
+        self._records += 1
+        if self._file is not None:
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def put(self, chat_id, text, key=None):
+        """Ставит сообщение в очередь, повтор ключа игнорируется.
+
+        Текст длиннее `MESSAGE_LIMIT` ставится несколькими сообщениями:
+        первое получает ключ `key`, следующие — `key.1`, `key.2` и так далее.
+        """
+        key = key or uuid.uuid4().hex
+        with self._lock:
+            if key in self._pending or key in self._delivered:
+                return False
+            for index, part in enumerate(split_text(text)):
+                message = OutboxMessage(
+                    f'{key}.{index}' if index else key, chat_id, part
+                )
+                self._pending[message.key] = message
+                self._write(message.to_record())
+        return True
+
+    def flush(self):
+        """Сбрасывает журнал на диск."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+    def _ready_batches(self, now):
+        """Собирает готовые сообщения в пачки по чатам с сохранением порядка.
+
+        Чат, у которого первое сообщение ждёт повтора, пропускается целиком,
+        чтобы не нарушать порядок уведомлений.
+        """
+        batches = OrderedDict()
+        blocked = set()
+        for message in self._pending.values():
+            if message.chat_id in blocked:
+                continue
+            if message.next_attempt > now:
+                blocked.add(message.chat_id)
+                continue
+            batch = batches.setdefault(message.chat_id, [[]])
+            current = batch[-1]
+            length = sum(
+                len(item.text) + len(MESSAGE_SEPARATOR) for item in current
+            )
+            if current and length + len(message.text) > MESSAGE_LIMIT:
+                batch.append([message])
+            else:
+                current.append(message)
+        return [group for batch in batches.values() for group in batch]
+
+    def drain(self, send):
+        """Отправляет готовые сообщения через `send(chat_id, text)`.
+
+        Сообщения одного чата склеиваются в одно, пока помещаются в лимит
+        Telegram. `send` возвращает True при успешной отправке и False,
+        если отправку стоит повторить позже, а для сообщения, которое
+        повторять бесполезно, поднимает `MessageRejectedError`. Разные чаты
+        отправляются параллельно, до `concurrency` запросов сразу, а
+        сообщения одного чата — по порядку.
+        """
+        with self._drain_lock:
+            with self._lock:
+                batches = self._ready_batches(self.clock())
+            chats = OrderedDict()
+            for batch in batches:
+                chats.setdefault(batch[0].chat_id, []).append(batch)
+            if self.concurrency > 1 and len(chats) > 1:
+                with ThreadPoolExecutor(
+                    max_workers=min(self.concurrency, len(chats)),
+                    thread_name_prefix='outbox-send',
+                ) as executor:
+                    delivered = sum(executor.map(
+                        lambda chat: self._send_chat(chat, send),
+                        chats.values(),
+                    ))
+            else:
+                delivered = sum(
+                    self._send_chat(chat, send) for chat in chats.values()
+                )
+            self.flush()
+            self._maybe_compact()
+            return delivered
+
+    def _send_chat(self, batches, send):
+        """Отправляет пачки одного чата до первой неудачи."""
+        delivered = 0
+        batches = deque(batches)
+        while batches:
+            batch = batches.popleft()
+            text = MESSAGE_SEPARATOR.join(item.text for item in batch)
+            try:
+                sent = send(batch[0].chat_id, text)
+            except MessageRejectedError as error:
+                if len(batch) > 1:
+                    # Отклонена склейка: отправляем её сообщения по одному,
+                    # чтобы отбросить только негодное
+                    batches.extendleft([item] for item in reversed(batch))
+                else:
+                    with self._lock:
+                        self._drop(batch[0], f'rejected: {error}')
+                continue
+            if not sent:
+                # Остальные пачки чата ждут, чтобы не нарушить порядок
+                self._retry_later(batch)
+                return delivered
+            self._ack(batch)
+            delivered += len(batch)
+        return delivered
+
+    def _ack(self, batch):
+        with self._lock:
+            for message in batch:
+                self._pending.pop(message.key, None)
+                self._remember_delivered(message.key)
+                self._write({'op': 'ack', 'key': message.key})
+
+    def _retry_later(self, batch):
+        now = self.clock()
+        with self._lock:
+            for message in batch:
+                message.attempts += 1
+                if message.attempts >= self.max_attempts:
+                    self._drop(
+                        message, f'after {message.attempts} attempts'
+                    )
+                    continue
+                delay = min(
+                    self.retry_base * 2 ** (message.attempts - 1),
+                    self.retry_max,
+                )
+                message.next_attempt = now + delay
+
+    def _drop(self, message, reason):
+        logger.error(
+            f'dropping message {message.key} for chat '
+            f'{message.chat_id} {reason}'
+        )
+        self._pending.pop(message.key, None)
+        self._write({'op': 'drop', 'key': message.key})
+
+    def _maybe_compact(self):
+        if self._file is None or self._compacting:
+            return
+        if self._records < (
+            self.compact_after + 2 * len(self._pending) + len(self._delivered)
+        ):
+            return
+        self._compacting = True
+        self._compaction = threading.Thread(
+            target=self.compact, name='outbox-compaction', daemon=True
+        )
+        self._compaction.start()
+
+    def compact(self):
+        """Переписывает журнал, оставляя ожидающие сообщения.
+
+        Подтверждения запомненных доставленных ключей тоже остаются, чтобы
+        после перезапуска повтор ключа по-прежнему игнорировался.
+        """
+        try:
+            with self._lock:
+                if self._file is None:
+                    # Очередь уже закрыта
+                    return
+                temporary = f'{self.path}.tmp'
+                records = [
+                    {'op': 'ack', 'key': key} for key in self._delivered
+                ] + [message.to_record() for message in self._pending.values()]
+                with open(temporary, 'w', encoding='utf-8') as file:
+                    for record in records:
+                        file.write(
+                            json.dumps(record, ensure_ascii=False) + '\n'
+                        )
+                    file.flush()
+                    os.fsync(file.fileno())
+                self._file.close()
+                os.replace(temporary, self.path)
+                self._file = open(self.path, 'a', encoding='utf-8')
+                self._records = len(records)
+        finally:
+            self._compacting = False
+
+    def close(self):
+        """Дожидается сжатия журнала, сбрасывает его и закрывает файл."""
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+        with self._lock:
+            if self._file is not None:
+                self.flush()
+                self._file.close()
+                self._file = None
@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from exceptions import BudgetExceededError
+
+
+class TokenBucket:
+    """Ведро токенов в форме GCRA: хранит теоретическое время прихода.
+
+    Запрос разрешён, когда до теоретического времени прихода осталось
+    не больше допуска на всплеск. Каждый разрешённый запрос сдвигает его
+    на интервал между запросами.
+    """
+
+    def __init__(self, rate, burst):
+        self.interval = 1 / rate
+        self.tolerance = (burst - 1) * self.interval
+        self.arrival = 0.0
+
+    def ready_at(self, now):
+        """Возвращает момент, когда ведро пропустит следующий запрос."""
+        return max(now, self.arrival - self.tolerance)
+
+    def take(self, at):
+        """Расходует токен на запрос в момент `at`."""
+        self.arrival = max(self.arrival, at) + self.interval
+
+    def block_until(self, moment):
+        """Не пропускает запросы раньше указанного момента."""
+        self.arrival = max(self.arrival, moment + self.tolerance)
+
+
+class RateLimiter:
+    """Общий ограничитель частоты запросов к API Практикума.
+
+    Запрос проходит через ведро своего токена и глобальное ведро.
+    Глобальные слоты резервируются под блокировкой в порядке обращения,
+    так что ожидающие обслуживаются по очереди, а спят уже без блокировки.
+    """
+
+    def __init__(self, rate, burst, token_rate, token_burst,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.global_bucket = TokenBucket(rate, burst)
+        self.token_rate = token_rate
+        self.token_burst = token_burst
+        self.clock = clock
+        self.sleep = sleep
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, **options):
+        """Создаёт ограничитель с лимитами из переменных окружения."""
+        return cls(
+            rate=float(os.getenv('PRACTICUM_RATE', 10)),
+            burst=int(os.getenv('PRACTICUM_BURST', 20)),
+            token_rate=float(os.getenv('PRACTICUM_TOKEN_RATE', 1)),
+            token_burst=int(os.getenv('PRACTICUM_TOKEN_BURST', 20)),
+            **options,
+        )
+
+    def _bucket(self, key):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.token_rate, self.token_burst)
+            self._buckets[key] = bucket
+        return bucket
+
+    def reserve(self, key, max_wait=None):
+        """Резервирует слот и возвращает время ожидания.
+
+        Пока ведро токена пусто, глобальный слот не занимается, чтобы
+        притормозивший токен не задерживал остальные: возвращается время
+        до его готовности и признак, что слот ещё не зарезервирован. Слот,
+        которого пришлось бы ждать дольше `max_wait`, не резервируется.
+        """
+        with self._lock:
+            now = self.clock()
+            bucket = self._bucket(key)
+            token_ready = bucket.ready_at(now)
+            if token_ready > now:
+                return token_ready - now, False
+            at = self.global_bucket.ready_at(now)
+            if max_wait is not None and at - now > max_wait:
+                raise BudgetExceededError(
+                    f'rate limit wait of {at - now:.1f}s exceeds the budget'
+                )
+            self.global_bucket.take(at)
+            bucket.take(at)
+        return at - now, True
+
+    def acquire(self, key, max_wait=None):
+        """Дожидается своей очереди на запрос и возвращает время ожидания.
+
+        Если токену придётся ждать дольше `max_wait` секунд, ожидание не
+        начинается и бросается `BudgetExceededError`.
+        """
+        waited = 0
+        while True:
+            delay, reserved = self.reserve(
+                key, None if max_wait is None else max_wait - waited
+            )
+            if (
+                not reserved and max_wait is not None
+                and waited + delay > max_wait
+            ):
+                raise BudgetExceededError(
+                    f'rate limit wait of {delay:.1f}s exceeds the budget'
+                )
+            if delay > 0:
+                self.sleep(delay)
+                waited += delay
+            if reserved:
+                return waited
+
+    def retry_after(self, key, seconds):
+        """Учитывает ответ 429: токен ждёт, сколько попросил сервер."""
+        with self._lock:
+            self._bucket(key).block_until(self.clock() + seconds)
+
+
+def parse_retry_after(value, default=60):
+    """Разбирает заголовок Retry-After в секундах или в виде даты."""
+    if not value:
+        return default
+    try:
+        return max(0, int(value))
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    return max(0, (moment - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,83 @@
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+ACTIVE = 0
+NORMAL = 1
+DORMANT = 2
+
+PRIORITY_NAMES = {ACTIVE: 'active', NORMAL: 'normal', DORMANT: 'dormant'}
+
+
+class PollScheduler:
+    """Выстраивает подписки в очередь опроса по классам приоритета.
+
+    Подписки с работой на ревью (`reviewing`) опрашиваются первыми, затем
+    обычные; спящие, у которых давно не менялись статусы, опрашиваются
+    раз в `dormant_every` циклов. Подписки, которые после сбоев ждут
+    `retry_at`, пропускаются. Очередь ограничена `capacity`, а при
+    перегрузке спящие подписки не опрашиваются вовсе. Всё, что не попало в
+    очередь или не успело опроситься, отбрасывается явно и учитывается.
+    """
+
+    def __init__(self, capacity=1000, dormant_after=7 * 24 * 3600,
+                 dormant_every=6, clock=time.time):
+        self.capacity = capacity
+        self.dormant_after = dormant_after
+        self.dormant_every = dormant_every
+        self.clock = clock
+        self.shed_total = 0
+
+    def classify(self, subscription, now):
+        """Возвращает класс приоритета подписки."""
+        if subscription.is_reviewing:
+            return ACTIVE
+        if now - subscription.last_change > self.dormant_after:
+            return DORMANT
+        return NORMAL
+
+    def _is_due(self, subscription, priority, overloaded):
+        if priority != DORMANT:
+            return True
+        if overloaded:
+            return False
+        return subscription.skipped + 1 >= self.dormant_every
+
+    def plan(self, subscriptions, overloaded=False):
+        """Возвращает очередь опроса на цикл, лишнее отбрасывает."""
+        now = self.clock()
+        queue = []
+        for subscription in subscriptions:
+            if subscription.paused:
+                continue
+            if subscription.retry_at > now:
+                subscription.skipped += 1
+                continue
+            priority = self.classify(subscription, now)
+            if self._is_due(subscription, priority, overloaded):
+                queue.append(
+                    (priority, subscription.last_polled, subscription)
+                )
+            else:
+                subscription.skipped += 1
+        queue.sort(key=lambda item: item[:2])
+        planned = [subscription for _, _, subscription in queue]
+        if len(planned) > self.capacity:
+            self.shed(planned[self.capacity:])
+            planned = planned[:self.capacity]
+        return planned
+
+    def polled(self, subscription):
+        """Отмечает, что подписка опрошена."""
+        subscription.last_polled = self.clock()
+        subscription.skipped = 0
+
+    def shed(self, subscriptions):
+        """Отбрасывает подписки, которые не поместились в цикл."""
+        for subscription in subscriptions:
+            subscription.skipped += 1
+        self.shed_total += len(subscriptions)
+        if subscriptions:
+            logger.warning(f'shed {len(subscriptions)} subscriptions')
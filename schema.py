@@ -0,0 +1,169 @@
+"""Декларативная схема ответа и её компиляция в проверку.
+
+Схема — словарь с ключами:
+- `type` — ожидаемый тип значения (или кортеж типов);
+- `fields` — схемы обязательных ключей словаря;
+- `items` — схема каждого элемента списка;
+- `choices` — допустимые значения, проверяются через `in`, так что
+  подходит и словарь, пополняемый после компиляции;
+- `missing` — исключение для отсутствующего ключа (`KeyError`).
+"""
+from collections import namedtuple
+from itertools import count
+
+
+# Проблема в значении: путь до него, описание и исключение, которым о ней
+# сообщают функции, требующие корректного значения
+Problem = namedtuple('Problem', ('path', 'message', 'error'))
+
+
+def format_path(path):
+    """Собирает путь вида `homeworks[0].status`."""
+    text = ''.join(
+        f'[{part}]' if isinstance(part, int) else f'.{part}' for part in path
+    )
+    return text.lstrip('.') or '<root>'
+
+
+def format_problems(problems, limit=5):
+    """Описывает проблемы одной строкой, не больше `limit` штук."""
+    text = '; '.join(
+        f'{format_path(problem.path)}: {problem.message}'
+        for problem in problems[:limit]
+    )
+    if len(problems) > limit:
+        text += f'; and {len(problems) - limit} more'
+    return text
+
+
+def _type_name(expected):
+    if isinstance(expected, tuple):
+        return ' or '.join(kind.__name__ for kind in expected)
+    return expected.__name__
+
+
+class _Source:
+    """Исходный код предиката и значения, на которые он ссылается."""
+
+    def __init__(self):
+        self.lines = ['def valid(value):']
+        self.namespace = {}
+        self._names = count()
+
+    def name(self):
+        return f'value_{next(self._names)}'
+
+    def bind(self, value):
+        name = f'const_{len(self.namespace)}'
+        self.namespace[name] = value
+        return name
+
+    def reject_if(self, condition, depth):
+        self.lines.append(f'{"    " * depth}if {condition}:')
+        self.lines.append(f'{"    " * depth}    return False')
+
+
+def _emit_test(schema, value, source, depth):
+    expected = source.bind(schema.get('type', object))
+    source.reject_if(f'not isinstance({value}, {expected})', depth)
+    for name, field in schema.get('fields', {}).items():
+        key, child = source.bind(name), source.name()
+        source.reject_if(f'{key} not in {value}', depth)
+        source.lines.append(f'{"    " * depth}{child} = {value}[{key}]')
+        _emit_test(field, child, source, depth)
+    if 'items' in schema:
+        child = source.name()
+        source.lines.append(f'{"    " * depth}for {child} in {value}:')
+        _emit_test(schema['items'], child, source, depth + 1)
+    if 'choices' in schema:
+        choices = source.bind(schema['choices'])
+        source.reject_if(f'{value} not in {choices}', depth)
+
+
+def _compile_test(schema):
+    """Собирает предикат корректности без сбора подробностей.
+
+    Схема разворачивается в исходный код одной функции: проверки
+    вложенных значений идут подряд, без вызова на каждый узел схемы.
+    """
+    source = _Source()
+    _emit_test(schema, 'value', source, 1)
+    source.lines.append('    return True')
+    exec('\n'.join(source.lines), source.namespace)
+    return source.namespace['valid']
+
+
+def _compile_report(schema):
+    """Собирает функцию, которая дописывает в список все проблемы."""
+    expected = schema.get('type', object)
+    missing = schema.get('missing', KeyError)
+    fields = tuple(
+        (name, _compile_report(field))
+        for name, field in schema.get('fields', {}).items()
+    )
+    item_report = 'items' in schema and _compile_report(schema['items'])
+    item_valid = 'items' in schema and _compile_test(schema['items'])
+    choices = schema.get('choices')
+
+    def report(value, path, problems):
+        if not isinstance(value, expected):
+            problems.append(Problem(
+                path,
+                f'expected {_type_name(expected)}, '
+                f'got {type(value).__name__}',
+                TypeError,
+            ))
+            return
+        for name, field_report in fields:
+            if name in value:
+                field_report(value[name], path + (name,), problems)
+            else:
+                problems.append(
+                    Problem(path + (name,), 'missing key', missing)
+                )
+        if item_report:
+            # Подробно разбираются только элементы, не прошедшие предикат
+            for index, item in enumerate(value):
+                if not item_valid(item):
+                    item_report(item, path + (index,), problems)
+        if choices is not None and value not in choices:
+            problems.append(
+                Problem(path, f'unexpected value {value!r}', KeyError)
+            )
+
+    return report
+
+
+class Validator:
+    """Проверка значения по схеме, скомпилированной один раз.
+
+    Корректное значение проходит один сгенерированный по схеме предикат,
+    без исключений и без построения путей. Только если он не прошёл, второй
+    проход собирает все проблемы сразу с путями до них.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self._valid = _compile_test(schema)
+        self._report = _compile_report(schema)
+
+    def problems(self, value):
+        """Возвращает список проблем значения, пустой для корректного."""
+        if self._valid(value):
+            return []
+        problems = []
+        self._report(value, (), problems)
+        return problems
+
+    def ensure(self, value):
+        """Возвращает корректное значение или бросает исключение.
+
+        Тип исключения берётся по первой проблеме, в сообщении — все,
+        а сам список лежит в атрибуте `problems` исключения.
+        """
+        problems = self.problems(value)
+        if problems:
+            error = problems[0].error(format_problems(problems))
+            error.problems = problems
+            raise error
+        return value
@@ -0,0 +1,395 @@
+"""Локальный симулятор API Практикума и Telegram Bot API.
+
+Запуск:
+
+    python simulator.py --latency lognormal:-2.5,0.8 --error-rate 0.01
+
+Бот направляется на симулятор переменными окружения
+`PRACTICUM_ENDPOINT=http://127.0.0.1:8080/api/user_api/homework_statuses/`
+и `TELEGRAM_API_URL=http://127.0.0.1:8081/bot`.
+"""
+import argparse
+import gzip
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+logger = logging.getLogger(__name__)
+
+PRACTICUM_PATH = '/api/user_api/homework_statuses/'
+LESSONS = (
+    'Основы Python', 'Django', 'API', 'Телеграм-бот', 'Итоговый проект',
+)
+
+
+class LatencyModel:
+    """Случайная задержка ответа по заданному распределению.
+
+    Описание вида `name:arg1,arg2`: `fixed:0.1`, `uniform:0.05,0.3`,
+    `exponential:0.2` (среднее), `lognormal:-2.5,0.8` (mu, sigma).
+    """
+
+    DISTRIBUTIONS = {
+        'fixed': lambda rng, value: value,
+        'uniform': lambda rng, low, high: rng.uniform(low, high),
+        'exponential': lambda rng, mean: rng.expovariate(1 / mean),
+        'lognormal': lambda rng, mu, sigma: rng.lognormvariate(mu, sigma),
+    }
+
+    def __init__(self, spec='fixed:0', seed=None):
+        name, _, args = spec.partition(':')
+        if name not in self.DISTRIBUTIONS:
+            raise ValueError(f'Unknown latency distribution: {name}')
+        self.spec = spec
+        self._sample = self.DISTRIBUTIONS[name]
+        self._args = [float(arg) for arg in args.split(',') if arg]
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        """Возвращает задержку в секундах."""
+        with self._lock:
+            return max(0, self._sample(self._rng, *self._args))
+
+
+class StudentTrack:
+    """Поток работ одного студента: ревью, доработки и новые проекты."""
+
+    def __init__(self, token, clock, mean_transition, seed, started):
+        self.rng = random.Random(f'{seed}:{token}')
+        self.clock = clock
+        self.mean_transition = mean_transition
+        self.homeworks = {}
+        self.next_id = 1
+        self.current = None
+        self.next_transition = started + self._delay()
+
+    def _delay(self):
+        return self.rng.expovariate(1 / self.mean_transition)
+
+    def _next_status(self):
+        if self.current is None or self.current['status'] == 'approved':
+            return 'reviewing'
+        if self.current['status'] == 'rejected':
+            return 'reviewing'
+        return 'approved' if self.rng.random() < 0.6 else 'rejected'
+
+    def _transition(self, moment):
+        status = self._next_status()
+        if self.current is None or self.current['status'] == 'approved':
+            lesson = LESSONS[(self.next_id - 1) % len(LESSONS)]
+            self.current = {
+                'id': self.next_id,
+                'homework_name': f'student__hw{self.next_id:02d}.zip',
+                'lesson_name': lesson,
+            }
+            self.homeworks[self.next_id] = self.current
+            self.next_id += 1
+        comment = 'Есть замечания к коду.' if status == 'rejected' else ''
+        self.current.update(
+            status=status,
+            reviewer_comment=comment,
+            updated=moment,
+            date_updated=datetime.fromtimestamp(
+                int(moment), timezone.utc
+            ).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        )
+
+    def statuses(self, from_date):
+        """Возвращает работы, статус которых менялся начиная с `from_date`."""
+        now = self.clock()
+        while self.next_transition <= now:
+            self._transition(self.next_transition)
+            self.next_transition += self._delay()
+        changed = [
+            homework for homework in self.homeworks.values()
+            if homework['updated'] >= from_date
+        ]
+        changed.sort(key=lambda homework: homework['updated'], reverse=True)
+        return [
+            {key: value for key, value in homework.items() if key != 'updated'}
+            for homework in changed
+        ]
+
+
+class Simulator:
+    """Симулятор обоих API с задержками и внедрением сбоев."""
+
+    def __init__(self, host='127.0.0.1', practicum_port=0, telegram_port=0,
+                 latency='fixed:0', error_rate=0, timeout_rate=0, hang=30,
+                 mean_transition=3600, tokens=None, clock=time.time,
+                 seed=0):
+        self.latency = LatencyModel(latency, seed)
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang = hang
+        self.mean_transition = mean_transition
+        self.tokens = set(tokens) if tokens else None
+        self.clock = clock
+        self.seed = seed
+        # История всех студентов отсчитывается от запуска симулятора
+        self.started = clock()
+        self.stats = Counter()
+        self.messages = []
+        self._tracks = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._servers = [
+            self._server(host, practicum_port, self._practicum_handler()),
+            self._server(host, telegram_port, self._telegram_handler()),
+        ]
+        self._threads = []
+
+    @staticmethod
+    def _server(host, port, handler):
+        server = _Server((host, port), handler)
+        server.daemon_threads = True
+        return server
+
+    @property
+    def practicum_url(self):
+        """Адрес эндпоинта homework_statuses."""
+        host, port = self._servers[0].server_address[:2]
+        return f'http://{host}:{port}{PRACTICUM_PATH}'
+
+    @property
+    def telegram_url(self):
+        """Базовый адрес Bot API, к которому дописывается токен."""
+        host, port = self._servers[1].server_address[:2]
+        return f'http://{host}:{port}/bot'
+
+    def start(self):
+        """Запускает оба сервера в фоновых потоках."""
+        for server in self._servers:
+            thread = threading.Thread(
+                target=server.serve_forever,
+                kwargs={'poll_interval': 0.05},
+                name='simulator',
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        """Останавливает серверы."""
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def count(self, name):
+        """Увеличивает счётчик статистики."""
+        with self._lock:
+            self.stats[name] += 1
+
+    def fault(self):
+        """Решает, какой сбой внедрить в ответ: `error`, `timeout` или None."""
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.timeout_rate:
+            return 'timeout'
+        if roll < self.timeout_rate + self.error_rate:
+            return 'error'
+        return None
+
+    def statuses(self, token, from_date):
+        """Возвращает ответ homework_statuses для токена."""
+        with self._lock:
+            track = self._tracks.get(token)
+            if track is None:
+                track = StudentTrack(
+                    token, self.clock, self.mean_transition, self.seed,
+                    self.started,
+                )
+                self._tracks[token] = track
+            homeworks = track.statuses(from_date)
+        return {'homeworks': homeworks, 'current_date': int(self.clock())}
+
+    def record_message(self, chat_id, text):
+        """Сохраняет сообщение, отправленное ботом."""
+        with self._lock:
+            self.messages.append((chat_id, text))
+            return len(self.messages)
+
+    def _practicum_handler(self):
+        simulator = self
+
+        class PracticumHandler(_Handler):
+            def do_GET(self):
+                simulator.count('practicum_requests')
+                if not self.delay_or_fail(simulator):
+                    return
+                url = urlparse(self.path)
+                auth = self.headers.get('Authorization', '')
+                token = auth[len('OAuth '):]
+                if url.path != PRACTICUM_PATH:
+                    return self.reply(HTTPStatus.NOT_FOUND, {})
+                if not auth.startswith('OAuth ') or (
+                    simulator.tokens is not None
+                    and token not in simulator.tokens
+                ):
+                    return self.reply(HTTPStatus.UNAUTHORIZED, {
+                        'code': 'not_authenticated',
+                        'message': 'Учетные данные не были предоставлены.',
+                        'source': '__response__',
+                    })
+                query = parse_qs(url.query)
+                try:
+                    from_date = int(query.get('from_date', ['0'])[0])
+                except ValueError:
+                    return self.reply(HTTPStatus.BAD_REQUEST, {
+                        'code': 'UnknownError',
+                        'error': {'error': 'Wrong from_date format'},
+                    })
+                self.reply(
+                    HTTPStatus.OK, simulator.statuses(token, from_date)
+                )
+
+        return PracticumHandler
+
+    def _telegram_handler(self):
+        simulator = self
+
+        class TelegramHandler(_Handler):
+            def setup(self):
+                simulator.count('telegram_connections')
+                super().setup()
+
+            def do_POST(self):
+                simulator.count('telegram_requests')
+                if not self.delay_or_fail(simulator):
+                    return
+                method = self.path.rsplit('/', 1)[-1]
+                params = self.read_params()
+                if method == 'getMe':
+                    return self.reply(HTTPStatus.OK, {'ok': True, 'result': {
+                        'id': 1, 'is_bot': True, 'first_name': 'simulator',
+                        'username': 'simulator_bot',
+                    }})
+                if method != 'sendMessage':
+                    return self.reply(HTTPStatus.NOT_FOUND, {
+                        'ok': False, 'error_code': 404,
+                        'description': 'Not Found',
+                    })
+                chat_id = params.get('chat_id')
+                message_id = simulator.record_message(
+                    chat_id, params.get('text')
+                )
+                self.reply(HTTPStatus.OK, {'ok': True, 'result': {
+                    'message_id': message_id,
+                    'date': int(simulator.clock()),
+                    'chat': {'id': int(chat_id), 'type': 'private'},
+                    'text': params.get('text'),
+                }})
+
+            do_GET = do_POST
+
+        return TelegramHandler
+
+
+class _Server(ThreadingHTTPServer):
+    """Сервер с длинной очередью подключений для всплесков соединений."""
+
+    request_queue_size = 1024
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Общая часть обработчиков: задержки, сбои и ответы в JSON."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def delay_or_fail(self, simulator):
+        """Выдерживает задержку, внедряет сбой; False — ответ уже отдан."""
+        time.sleep(simulator.latency.sample())
+        fault = simulator.fault()
+        if fault == 'timeout':
+            simulator.count('timeouts')
+            time.sleep(simulator.hang)
+            self.close_connection = True
+            return False
+        if fault == 'error':
+            simulator.count('errors')
+            self.reply(HTTPStatus.SERVICE_UNAVAILABLE, {})
+            return False
+        return True
+
+    def read_params(self):
+        """Читает параметры запроса из JSON, формы или строки запроса."""
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode() if length else ''
+        if self.headers.get('Content-Type', '').startswith(
+            'application/json'
+        ):
+            return json.loads(body or '{}')
+        query = parse_qs(body or urlparse(self.path).query)
+        return {key: values[0] for key, values in query.items()}
+
+    def reply(self, status, payload):
+        """Отправляет ответ в JSON, сжатый gzip, если клиент его принимает."""
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        compress = 'gzip' in self.headers.get('Accept-Encoding', '')
+        if compress:
+            body = gzip.compress(body)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if compress:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main():
+    """Запускает симулятор из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--practicum-port', type=int, default=8080)
+    parser.add_argument('--telegram-port', type=int, default=8081)
+    parser.add_argument('--latency', default='fixed:0')
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--timeout-rate', type=float, default=0)
+    parser.add_argument('--hang', type=float, default=30)
+    parser.add_argument('--mean-transition', type=float, default=3600)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    simulator = Simulator(
+        host=args.host,
+        practicum_port=args.practicum_port,
+        telegram_port=args.telegram_port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        hang=args.hang,
+        mean_transition=args.mean_transition,
+        seed=args.seed,
+    ).start()
+    logger.info(f'practicum: {simulator.practicum_url}')
+    logger.info(f'telegram: {simulator.telegram_url}')
+    try:
+        while True:
+            time.sleep(60)
+            logger.info(f'stats: {dict(simulator.stats)}')
+    except KeyboardInterrupt:
+        simulator.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,310 @@
+import logging
+import mmap
+import os
+import struct
+import time
+import zlib
+from array import array
+from itertools import accumulate, islice
+
+from subscriptions import Subscription
+
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'HWSN'
+VERSION = 3
+# Заголовок: сигнатура, версия, CRC32 и длина тела
+HEADER = struct.Struct('<4sHIQ')
+COUNT = struct.Struct('<Q')
+# Строки снимка лежат одной таблицей, записи ссылаются на них номерами;
+# нулевой номер означает None
+# Токен, чат, курсор (или -1), пауза, время изменения и опроса, пропуски,
+# сбои подряд и время следующей попытки, число статусов
+SUBSCRIPTION = struct.Struct('<IIqBddIIdI')
+# Идентификатор работы: число или номер строки (число вне int64 хранится
+# строкой), статус и дата
+INT_ID, STR_ID, BIG_ID = 0, 1, 2
+INT64 = range(-2 ** 63, 2 ** 63)
+STATUS = struct.Struct('<BqII')
+# Ключ, чат и текст сообщения
+MESSAGE = struct.Struct('<III')
+
+
+class SnapshotError(Exception):
+    """Исключение для повреждённого или чужого снимка."""
+
+    pass
+
+
+class _Strings:
+    """Таблица строк: повторяющиеся статусы и даты хранятся один раз."""
+
+    def __init__(self):
+        self.index = {}
+
+    def __call__(self, value):
+        if value is None:
+            return 0
+        value = str(value)
+        number = self.index.get(value)
+        if number is None:
+            number = self.index[value] = len(self.index) + 1
+        return number
+
+    def encode(self):
+        # Длины в символах: таблица декодируется одним вызовом и режется
+        # срезами строки
+        lengths = array('I', map(len, self.index))
+        blob = ''.join(self.index).encode('utf-8')
+        return b''.join((
+            COUNT.pack(len(lengths)), lengths.tobytes(),
+            COUNT.pack(len(blob)), blob,
+        ))
+
+
+def _records(layout, rows):
+    rows = list(rows)
+    return COUNT.pack(len(rows)) + b''.join(
+        layout.pack(*row) for row in rows
+    )
+
+
+def encode(subscriptions, messages):
+    """Кодирует подписки и неотправленные сообщения в двоичный снимок."""
+    strings = _Strings()
+    subscription_rows, status_rows = [], []
+    for subscription in subscriptions:
+        statuses = list(subscription.statuses.items())
+        subscription_rows.append((
+            strings(subscription.token),
+            strings(subscription.chat_id),
+            -1 if subscription.cursor is None else subscription.cursor,
+            subscription.paused,
+            subscription.last_change,
+            subscription.last_polled,
+            subscription.skipped,
+            subscription.failures,
+            subscription.retry_at,
+            len(statuses),
+        ))
+        for homework_id, (status, date_updated) in statuses:
+            status_rows.append((
+                *_homework_id(homework_id, strings),
+                strings(status),
+                strings(date_updated),
+            ))
+    message_rows = [
+        (strings(message.key), strings(message.chat_id),
+         strings(message.text))
+        for message in messages
+    ]
+    body = b''.join((
+        _records(SUBSCRIPTION, subscription_rows),
+        _records(STATUS, status_rows),
+        _records(MESSAGE, message_rows),
+        strings.encode(),
+    ))
+    return HEADER.pack(MAGIC, VERSION, zlib.crc32(body), len(body)) + body
+
+
+class _Reader:
+    """Читает тело снимка прямо из отображённой в память области."""
+
+    def __init__(self, view):
+        self.view = view
+        self.offset = 0
+
+    def take(self, size):
+        end = self.offset + size
+        if end > len(self.view):
+            raise SnapshotError('snapshot is truncated')
+        chunk = self.view[self.offset:end]
+        self.offset = end
+        return chunk
+
+    def count(self):
+        return COUNT.unpack(self.take(COUNT.size))[0]
+
+    def records(self, layout):
+        return list(layout.iter_unpack(self.take(layout.size * self.count())))
+
+    def strings(self):
+        lengths = array('I')
+        lengths.frombytes(self.take(lengths.itemsize * self.count()))
+        text = str(self.take(self.count()), 'utf-8')
+        ends = list(accumulate(lengths))
+        return [None] + [
+            text[end - length:end] for end, length in zip(ends, lengths)
+        ]
+
+
+def _homework_id(homework_id, strings):
+    if not isinstance(homework_id, int):
+        return STR_ID, strings(homework_id)
+    if homework_id in INT64:
+        return INT_ID, homework_id
+    return BIG_ID, strings(str(homework_id))
+
+
+def _homework_key(kind, homework_id, strings):
+    if kind == INT_ID:
+        return homework_id
+    if kind == BIG_ID:
+        return int(strings[homework_id])
+    return strings[homework_id]
+
+
+def decode(data):
+    """Разбирает снимок, возвращает подписки и сообщения `(ключ, чат, текст)`.
+
+    `data` — любой буфер, например `mmap`: записи фиксированной длины
+    читаются `iter_unpack` прямо из `memoryview`, а таблица строк
+    декодируется одним вызовом.
+    """
+    with memoryview(data) as view:
+        if len(view) < HEADER.size:
+            raise SnapshotError('snapshot is truncated')
+        magic, version, checksum, length = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise SnapshotError(f'unknown snapshot format {magic!r} {version}')
+        with view[HEADER.size:HEADER.size + length] as body:
+            if len(body) != length or zlib.crc32(body) != checksum:
+                raise SnapshotError('snapshot checksum mismatch')
+            reader = _Reader(body)
+            subscription_rows = reader.records(SUBSCRIPTION)
+            status_rows = reader.records(STATUS)
+            message_rows = reader.records(MESSAGE)
+            strings = reader.strings()
+    return _build(strings, subscription_rows, status_rows, message_rows)
+
+
+def _build(strings, subscription_rows, status_rows, message_rows):
+    statuses = iter(status_rows)
+    subscriptions = []
+    for row in subscription_rows:
+        token, chat_id, cursor, paused, *schedule, count = row
+        subscription = Subscription(strings[token], strings[chat_id])
+        subscription.cursor = None if cursor < 0 else cursor
+        subscription.paused = bool(paused)
+        (
+            subscription.last_change,
+            subscription.last_polled,
+            subscription.skipped,
+            subscription.failures,
+            subscription.retry_at,
+        ) = schedule
+        subscription.statuses = {
+            _homework_key(kind, homework_id, strings):
+                (strings[status], strings[date_updated])
+            for kind, homework_id, status, date_updated
+            in islice(statuses, count)
+        }
+        subscriptions.append(subscription)
+    messages = [
+        (strings[key], strings[chat_id], strings[text])
+        for key, chat_id, text in message_rows
+    ]
+    return subscriptions, messages
+
+
+class SnapshotStore:
+    """Периодические снимки всего состояния бота для быстрой замены.
+
+    В снимок попадают подписки с курсорами, последними статусами работ,
+    расписанием опроса и паузой после сбоев и неотправленные сообщения.
+    Снимок пишется во временный файл и атомарно подменяет прежний, а
+    читается через `mmap`, так что новый процесс поднимает состояние за
+    миллисекунды и не опрашивает заново все подписки с пустой картиной
+    статусов. Без пути к файлу снимки не пишутся. В снимке лежат токены
+    API Практикума, поэтому файл доступен только владельцу (0600).
+    """
+
+    def __init__(self, path=None, interval=60, clock=time.monotonic):
+        self.path = path
+        self.interval = interval
+        self.clock = clock
+        self._saved_at = None
+
+    def save(self, registry, outbox):
+        """Атомарно записывает снимок состояния."""
+        if not self.path:
+            return
+        started = time.perf_counter()
+        data = encode(list(registry), outbox.pending())
+        temporary = f'{self.path}.tmp'
+        descriptor = os.open(
+            temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600
+        )
+        # Права оставшегося от прошлого сбоя файла O_CREAT не меняет
+        os.fchmod(descriptor, 0o600)
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
+        self._saved_at = self.clock()
+        logger.debug(
+            f'snapshot saved: {len(data)} bytes in '
+            f'{(time.perf_counter() - started) * 1000:.1f} ms'
+        )
+
+    def maybe_save(self, registry, outbox):
+        """Записывает снимок, если с прошлого прошло `interval` секунд."""
+        if (
+            self._saved_at is None
+            or self.clock() - self._saved_at >= self.interval
+        ):
+            self.save(registry, outbox)
+
+    def load(self):
+        """Читает снимок, возвращает `(подписки, сообщения)` или None."""
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'rb') as file, mmap.mmap(
+                file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as data:
+                return decode(data)
+        except (OSError, ValueError, IndexError, SnapshotError) as error:
+            logger.error(f'snapshot is not readable: {error}')
+            return None
+
+    def restore(self, registry, outbox):
+        """Восстанавливает состояние из снимка, возвращает число подписок.
+
+        Подписки, которых нет в реестре, добавляются, только если у реестра
+        нет файла подписок: иначе файл главнее снимка. Сообщения ставятся в
+        очередь по своим ключам, так что уже восстановленные из журнала
+        очереди не задваиваются.
+        """
+        started = time.perf_counter()
+        loaded = self.load()
+        if loaded is None:
+            return 0
+        subscriptions, messages = loaded
+        restored = 0
+        for saved in subscriptions:
+            cursor = saved.cursor
+            current = registry.get(saved.key)
+            if current is None:
+                if registry.path:
+                    continue
+                current = registry.add(saved)
+            current.cursor = cursor
+            current.statuses.update(saved.statuses)
+            current.paused = saved.paused
+            current.last_change = saved.last_change
+            current.last_polled = saved.last_polled
+            current.skipped = saved.skipped
+            current.failures = saved.failures
+            current.retry_at = saved.retry_at
+            restored += 1
+        for key, chat_id, text in messages:
+            outbox.put(chat_id, text, key=key)
+        logger.info(
+            f'snapshot restored: {restored} subscriptions, '
+            f'{len(messages)} messages in '
+            f'{(time.perf_counter() - started) * 1000:.1f} ms'
+        )
+        return restored
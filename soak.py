@@ -0,0 +1,241 @@
+"""Проверка памяти бота за долгую работу в виртуальном времени.
+
+Запуск:
+
+    python soak.py --days 30 --subscriptions 100 --max-growth 256
+
+Бот работает в `clock.VirtualClock` против локального симулятора: Bot API
+через HTTP, API Практикума — в том же процессе или, с `--http`, тоже
+через HTTP. Через равные промежутки виртуального времени `tracemalloc`
+снимает память, занятую кодом бота (всё, что выделено в симуляторе,
+отбрасывается). По снимкам после прогрева считается прирост памяти на
+цикл опроса; если он больше `--max-growth` байт, скрипт завершается с
+ошибкой и показывает строки, где память растёт сильнее всего.
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import sys
+import tempfile
+import tracemalloc
+from collections import namedtuple
+from contextlib import ExitStack, contextmanager
+
+import subscriptions
+from clock import SimulationFinished, VirtualClock
+from ratelimit import RateLimiter
+from simulator import Simulator
+from tokens import TokenManager
+
+
+DAY = 24 * 3600
+# Глубины стека хватает, чтобы узнать потоки симулятора по его кадрам
+TRACE_FRAMES = 16
+TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+    tracemalloc.Filter(False, '<unknown>'),
+    tracemalloc.Filter(False, f'*{os.sep}simulator.py', all_frames=True),
+    # Потоки HTTP-серверов симулятора
+    tracemalloc.Filter(False, f'*{os.sep}socketserver.py', all_frames=True),
+    tracemalloc.Filter(False, __file__),
+)
+
+# Итог прогона: число циклов, снимки `(цикл, байт)`, прирост на цикл и
+# строки кода с наибольшим приростом
+SoakReport = namedtuple(
+    'SoakReport', ('cycles', 'samples', 'growth_per_cycle', 'top')
+)
+
+
+class InProcessTransport:
+    """Транспорт, который отвечает из симулятора без HTTP."""
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+
+    def get_json(self, url, headers, params, timeout=None):
+        """Возвращает ответ симулятора для токена из заголовка."""
+        token = headers['Authorization'].split(' ', 1)[-1]
+        return self.simulator.statuses(token, int(params['from_date']))
+
+    def close(self):
+        """Соединений нет, закрывать нечего."""
+
+
+@contextmanager
+def patched(module, **values):
+    """Временно подменяет атрибуты модуля."""
+    previous = {name: getattr(module, name) for name in values}
+    for name, value in values.items():
+        setattr(module, name, value)
+    try:
+        yield module
+    finally:
+        for name, value in previous.items():
+            setattr(module, name, value)
+
+
+def counted(function, calls):
+    """Оборачивает функцию так, что каждый вызов дописывается в `calls`."""
+    def wrapper(*args, **kwargs):
+        calls.append(None)
+        return function(*args, **kwargs)
+
+    return wrapper
+
+
+def traced_size():
+    """Возвращает байты, занятые кодом бота, и снимок памяти."""
+    # Циклические ссылки, которые ещё не собраны, утечкой не считаются
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+    return sum(stat.size for stat in snapshot.statistics('filename')), snapshot
+
+
+def growth_per_cycle(samples):
+    """Наклон прямой, проведённой по снимкам методом наименьших квадратов."""
+    if len(samples) < 2:
+        return 0.0
+    count = len(samples)
+    mean_x = sum(cycle for cycle, _ in samples) / count
+    mean_y = sum(size for _, size in samples) / count
+    spread = sum((cycle - mean_x) ** 2 for cycle, _ in samples)
+    if not spread:
+        return 0.0
+    return sum(
+        (cycle - mean_x) * (size - mean_y) for cycle, size in samples
+    ) / spread
+
+
+def subscriptions_file(directory, count):
+    """Пишет файл подписок с `count` токенами студентов симулятора."""
+    path = os.path.join(directory, 'subscriptions.json')
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump([
+            {'token': f'student-{number}', 'chat_id': 1000 + number}
+            for number in range(count)
+        ], file)
+    return path
+
+
+def run(days=7, subscriptions_count=10, samples=10, warmup=0.2,
+        mean_transition=6 * 3600, http=False, seed=0):
+    """Гоняет бота `days` виртуальных дней и снимает память.
+
+    Первые `warmup` от срока бот прогревается: наполняются кэши и пулы,
+    снимки берутся равномерно по оставшемуся времени.
+    """
+    import homework as bot
+
+    clock = VirtualClock(until=days * DAY)
+    cycles = []
+    taken = []
+    # Первый и последний снимки — для строк с наибольшим приростом
+    snapshots = []
+
+    def sample():
+        size, snapshot = traced_size()
+        taken.append((len(cycles), size))
+        snapshots[1:] = [snapshot]
+
+    start = warmup * days * DAY
+    step = (days * DAY - start) / max(samples - 1, 1)
+    for number in range(samples):
+        clock.call_at(start + number * step - 1, sample)
+
+    simulator = Simulator(
+        clock=clock.time, mean_transition=mean_transition, seed=seed
+    )
+    with tempfile.TemporaryDirectory() as directory, ExitStack() as stack:
+        stack.enter_context(simulator)
+        files = {
+            name: os.path.join(directory, name.lower())
+            for name in (
+                'CHECKPOINT_FILE', 'OUTBOX_FILE', 'HISTORY_FILE',
+                'SNAPSHOT_FILE',
+            )
+        }
+        stack.enter_context(patched(
+            bot,
+            PRACTICUM_TOKEN=bot.PRACTICUM_TOKEN or 'soak',
+            TELEGRAM_TOKEN=bot.TELEGRAM_TOKEN or '1234:soak',
+            TELEGRAM_CHAT_ID=bot.TELEGRAM_CHAT_ID or '1',
+            ADMIN_PORT=None,
+            ENDPOINT=simulator.practicum_url,
+            TELEGRAM_API_URL=simulator.telegram_url,
+            SUBSCRIPTIONS_FILE=subscriptions_file(
+                directory, subscriptions_count
+            ),
+            TRANSPORT=bot.TRANSPORT if http else InProcessTransport(
+                simulator
+            ),
+            run_cycle=counted(bot.run_cycle, cycles),
+            # Ограничитель и токены живут в модуле: каждый прогон начинает
+            # со своих, иначе они помнят время прошлой симуляции
+            RATE_LIMITER=RateLimiter.from_env(
+                clock=clock.monotonic, sleep=clock.sleep
+            ),
+            TOKENS=TokenManager(
+                probe=bot.TOKENS.probe,
+                quarantine=bot.TOKENS.quarantine_base,
+                quarantine_max=bot.TOKENS.quarantine_max,
+                clock=clock.time,
+            ),
+            **files,
+        ))
+        # Логи пишутся как обычно, но в никуда; чужие обработчики корневого
+        # логгера (например, сбор логов в pytest) копили бы записи
+        stack.enter_context(
+            patched(logging.getLogger(), handlers=[bot.handler])
+        )
+        devnull = stack.enter_context(open(os.devnull, 'w'))
+        stream = bot.handler.setStream(devnull)
+        stack.callback(bot.handler.setStream, stream)
+        stack.enter_context(clock.installed(bot, subscriptions))
+        tracemalloc.start(TRACE_FRAMES)
+        stack.callback(tracemalloc.stop)
+        try:
+            bot.main()
+        except SimulationFinished:
+            pass
+        top = []
+        if len(snapshots) > 1:
+            top = snapshots[-1].compare_to(snapshots[0], 'lineno')[:10]
+    return SoakReport(len(cycles), taken, growth_per_cycle(taken), top)
+
+
+def main():
+    """Запускает прогон из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=float, default=30)
+    parser.add_argument('--subscriptions', type=int, default=100)
+    parser.add_argument('--samples', type=int, default=10)
+    parser.add_argument('--mean-transition', type=float, default=6 * 3600)
+    parser.add_argument('--http', action='store_true')
+    parser.add_argument(
+        '--max-growth', type=float, default=256,
+        help='допустимый прирост памяти, байт на цикл',
+    )
+    args = parser.parse_args()
+    report = run(
+        days=args.days,
+        subscriptions_count=args.subscriptions,
+        samples=args.samples,
+        mean_transition=args.mean_transition,
+        http=args.http,
+    )
+    for cycle, size in report.samples:
+        print(f'cycle {cycle:>8}: {size / 1024:>10.1f} KiB')
+    print(f'{report.cycles} cycles, '
+          f'{report.growth_per_cycle:.1f} bytes per cycle')
+    if report.growth_per_cycle > args.max_growth:
+        for stat in report.top:
+            print(stat)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
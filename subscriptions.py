@@ -0,0 +1,215 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+def token_fingerprint(token):
+    """Возвращает короткий отпечаток токена для логов и ключей."""
+    return hashlib.sha256(str(token).encode()).hexdigest()[:12]
+
+
+class Subscription:
+    """Подписка чата на статусы домашних работ по токену Практикума."""
+
+    def __init__(self, token, chat_id, cursor=None):
+        self.token = token
+        self.chat_id = None if chat_id is None else str(chat_id)
+        self.cursor = cursor
+        self.statuses = {}
+        self.last_change = time.time()
+        self.last_polled = 0
+        self.skipped = 0
+        self.paused = False
+        self.last_error = None
+        # Сбои подряд и момент, раньше которого подписка не опрашивается
+        self.failures = 0
+        self.retry_at = 0
+        self._lock = threading.Lock()
+
+    @property
+    def key(self):
+        """Ключ подписки, не раскрывающий токен."""
+        return f'{self.chat_id}:{token_fingerprint(self.token)}'
+
+    def status_of(self, homework):
+        """Возвращает последний известный статус работы или None."""
+        homework_id = homework.get('id', homework.get('homework_name'))
+        status, _ = self.statuses.get(homework_id, (None, None))
+        return status
+
+    def remember_status(self, homework):
+        """Запоминает статус работы, возвращает False для уже известного."""
+        homework_id = homework.get('id', homework.get('homework_name'))
+        status = (homework.get('status'), homework.get('date_updated'))
+        with self._lock:
+            if self.statuses.get(homework_id) == status:
+                return False
+            self.statuses[homework_id] = status
+            self.last_change = time.time()
+        return True
+
+    @property
+    def is_reviewing(self):
+        """Есть ли у подписки работа на ревью."""
+        with self._lock:
+            return any(
+                status == 'reviewing' for status, _ in self.statuses.values()
+            )
+
+    def describe(self):
+        """Возвращает состояние подписки без токена."""
+        with self._lock:
+            statuses = {
+                str(homework_id): status
+                for homework_id, (status, _) in self.statuses.items()
+            }
+        return {
+            'key': self.key,
+            'chat_id': self.chat_id,
+            'cursor': self.cursor,
+            'paused': self.paused,
+            'last_polled': self.last_polled,
+            'last_error': self.last_error,
+            'failures': self.failures,
+            'retry_at': self.retry_at,
+            'statuses': statuses,
+        }
+
+    def __repr__(self):
+        return f'<Subscription {self.key}>'
+
+
+class ChatBot:
+    """Бот, привязанный к чату конкретной подписки."""
+
+    def __init__(self, bot, chat_id):
+        self.bot = bot
+        self.chat_id = chat_id
+
+    def __getattr__(self, name):
+        return getattr(self.bot, name)
+
+
+class SubscriptionRegistry:
+    """Хранит список подписок и перечитывает его без перезапуска.
+
+    Подписки можно добавлять и удалять на ходу: изменения сохраняются в
+    файл подписок, если он задан, и переживают перечитывание. Блокировка
+    защищает только сам список и никогда не держится во время запросов.
+    """
+
+    def __init__(self, default=None, path=None):
+        self.default = default
+        self.path = path
+        self._subscriptions = {}
+        self._added = {}
+        self._removed = set()
+        self._lock = threading.RLock()
+        self.reload()
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._subscriptions.values()))
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+    def get(self, key):
+        """Возвращает подписку по ключу."""
+        return self._subscriptions.get(key)
+
+    def reload(self):
+        """Перечитывает список подписок, сохраняя курсоры оставшихся."""
+        read = list(self._read())
+        default_key = self.default.key if self.default else None
+        with self._lock:
+            loaded = {}
+            for subscription in [*read, *self._added.values()]:
+                if subscription.key in self._removed:
+                    # Подписку из окружения правкой файла не убрать, а
+                    # остальные удаление уже вычеркнуло из файла: раз она
+                    # там снова, её вписали обратно
+                    if subscription.key == default_key:
+                        continue
+                    self._removed.discard(subscription.key)
+                current = self._subscriptions.get(subscription.key)
+                loaded.setdefault(subscription.key, current or subscription)
+            removed = set(self._subscriptions) - set(loaded)
+            self._subscriptions = loaded
+        logger.info(
+            f'subscriptions loaded: {len(loaded)}, removed: {len(removed)}'
+        )
+        return loaded
+
+    def add(self, subscription):
+        """Добавляет подписку, возвращает уже существующую с тем же ключом.
+
+        Новая подписка без курсора получает текущее время: иначе её нечем
+        опрашивать до следующего перечитывания курсоров.
+        """
+        with self._lock:
+            self._removed.discard(subscription.key)
+            current = self._subscriptions.get(subscription.key)
+            if current is not None:
+                return current
+            if subscription.cursor is None:
+                subscription.cursor = int(time.time())
+            self._subscriptions[subscription.key] = subscription
+            # С файлом подписка живёт в нём, и её можно убрать правкой
+            # файла; без файла перечитывание берёт её из памяти
+            if self.path:
+                self._save()
+            else:
+                self._added[subscription.key] = subscription
+        return subscription
+
+    def remove(self, key):
+        """Удаляет подписку по ключу."""
+        with self._lock:
+            subscription = self._subscriptions.pop(key, None)
+            self._added.pop(key, None)
+            if subscription is not None:
+                self._removed.add(key)
+                self._save()
+        return subscription
+
+    def _save(self):
+        if not self.path:
+            return
+        default_key = self.default.key if self.default else None
+        items = [
+            {'token': subscription.token, 'chat_id': subscription.chat_id}
+            for key, subscription in self._subscriptions.items()
+            if key != default_key
+        ]
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(items, file)
+        os.replace(temporary, self.path)
+
+    def _read(self):
+        if self.default and self.default.token and self.default.chat_id:
+            yield self.default
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as file:
+            for item in json.load(file):
+                yield Subscription(item['token'], item['chat_id'])
+
+    def cursors(self):
+        """Возвращает курсоры всех подписок."""
+        return {
+            subscription.key: subscription.cursor for subscription in self
+        }
+
+    def restore_cursors(self, cursors, default):
+        """Восстанавливает курсоры из контрольной точки."""
+        for subscription in self:
+            if subscription.cursor is None:
+                subscription.cursor = cursors.get(subscription.key, default)
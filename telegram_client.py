@@ -0,0 +1,26 @@
+from telegram.utils.request import Request
+
+
+def configure_bot(bot, pool_size=8, connect_timeout=5.0, read_timeout=5.0):
+    """Даёт боту общий для всех чатов пул соединений с Bot API.
+
+    По умолчанию python-telegram-bot держит одно соединение, и
+    параллельные отправки ждут друг друга. Бот в `main()` создаётся только
+    с токеном, поэтому пул подменяется уже у созданного бота.
+    """
+    bot._request = Request(
+        con_pool_size=pool_size,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+    )
+    return bot
+
+
+def bot_pool(bot):
+    """Пул соединений бота с Bot API или None, если у бота его нет."""
+    request = getattr(bot, '_request', None)
+    pool_manager = getattr(request, '_con_pool', None)
+    base_url = getattr(bot, 'base_url', None)
+    if pool_manager is None or base_url is None:
+        return None
+    return pool_manager.connection_from_url(base_url)
@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 import pytest_timeout
 
 root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -53,3 +54,36 @@ pytest_timeout.write = write_timeout_reasons
 os.environ['PRACTICUM_TOKEN'] = 'sometoken'
 os.environ['TELEGRAM_TOKEN'] = '1234:abcdefg'
 os.environ['TELEGRAM_CHAT_ID'] = '12345'
+
+
+class FakeAPI:
+    """Подменяет `request_homework_statuses`: запоминает `from_date`
+    запросов и отвечает тем, что вернёт `respond(from_date)`.
+    """
+
+    def __init__(self):
+        self.requested = []
+        self.respond = lambda from_date: {
+            'homeworks': [], 'current_date': from_date,
+        }
+
+    def __call__(self, headers, from_date):
+        self.requested.append(from_date)
+        return self.respond(from_date)
+
+
+@pytest.fixture
+def fresh_tokens(monkeypatch, homework_module):
+    """Даёт боту пустой кэш проверенных токенов."""
+    from tokens import TokenManager
+    tokens = TokenManager()
+    monkeypatch.setattr(homework_module, 'TOKENS', tokens)
+    return tokens
+
+
+@pytest.fixture
+def fake_api(monkeypatch, homework_module, fresh_tokens):
+    """Подменяет запросы бота к API Практикума."""
+    api = FakeAPI()
+    monkeypatch.setattr(homework_module, 'request_homework_statuses', api)
+    return api
@@ -0,0 +1,147 @@
+from http import HTTPStatus
+
+import requests
+
+from admin import AdminServer
+from subscriptions import Subscription, SubscriptionRegistry
+
+
+def make_admin(tmp_path, token=None):
+    registry = SubscriptionRegistry(
+        default=Subscription('default-token', 1),
+        path=str(tmp_path / 'subscriptions.json'),
+    )
+    polled = []
+    admin = AdminServer(registry, polled.append, token=token).start()
+    return admin, registry, polled
+
+
+def test_add_list_pause_and_remove(tmp_path):
+    admin, registry, _ = make_admin(tmp_path)
+    try:
+        url = f'{admin.url}/subscriptions'
+        response = requests.post(
+            url, json={'token': 'secret', 'chat_id': 42}, timeout=1
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        key = response.json()['key']
+        assert key.startswith('42:')
+        assert 'secret' not in response.text
+        assert len(registry) == 2
+
+        listed = requests.get(url, timeout=1).json()
+        assert {item['chat_id'] for item in listed} == {'1', '42'}
+
+        paused = requests.post(f'{url}/{key}/pause', timeout=1).json()
+        assert paused['paused'] and registry.get(key).paused
+
+        requests.delete(f'{url}/{key}', timeout=1)
+        assert registry.get(key) is None
+        # Удаление переживает перечитывание файла подписок
+        registry.reload()
+        assert registry.get(key) is None
+        assert requests.get(f'{url}/{key}', timeout=1).status_code == (
+            HTTPStatus.NOT_FOUND
+        )
+    finally:
+        admin.stop()
+
+
+def test_force_poll_and_auth(tmp_path):
+    admin, registry, polled = make_admin(tmp_path, token='admin')
+    try:
+        key = next(iter(registry)).key
+        url = f'{admin.url}/subscriptions/{key}/poll'
+        assert requests.post(url, timeout=1).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        response = requests.post(
+            url, headers={'Authorization': 'Bearer admin'}, timeout=1
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert polled == [registry.get(key)]
+    finally:
+        admin.stop()
+
+
+def test_failures_report(tmp_path):
+    from failures import FailureTracker
+
+    registry = SubscriptionRegistry(default=Subscription('token', 1))
+    tracker = FailureTracker()
+    tracker.failed(next(iter(registry)), ConnectionError('refused'))
+    admin = AdminServer(registry, None, failures=tracker.report).start()
+    try:
+        report = requests.get(f'{admin.url}/failures?limit=5', timeout=1)
+        assert report.json()['counts'] == {'ConnectionError': 1}
+        assert requests.get(
+            f'{admin.url}/failures?limit=many', timeout=1
+        ).status_code == HTTPStatus.BAD_REQUEST
+    finally:
+        admin.stop()
+
+
+def test_added_subscription_can_be_polled(fake_api, homework_module):
+    from coalescing import SingleFlight
+    from outbox import Outbox
+
+    homework = {'id': 1, 'homework_name': 'hw01', 'status': 'approved',
+                'date_updated': '2024-01-01T00:00:00Z'}
+    fake_api.respond = lambda from_date: {
+        'homeworks': [homework], 'current_date': from_date + 1000,
+    }
+    outbox = Outbox()
+    registry = SubscriptionRegistry(default=Subscription('token', 1))
+    admin = AdminServer(
+        registry,
+        lambda subscription: homework_module.poll_subscription(
+            subscription, SingleFlight(), outbox
+        ),
+    ).start()
+    try:
+        url = f'{admin.url}/subscriptions'
+        key = requests.post(
+            url, json={'token': 'other', 'chat_id': 2}, timeout=1
+        ).json()['key']
+        assert registry.get(key).cursor is not None
+        requests.post(f'{url}/{key}/poll', timeout=1)
+    finally:
+        admin.stop()
+    subscription = registry.get(key)
+    assert subscription.last_error is None
+    assert subscription.cursor == fake_api.requested[0] + 1000
+    assert [message.chat_id for message in outbox.pending()] == ['2']
+
+
+def test_added_subscription_is_removed_by_editing_the_file(tmp_path):
+    admin, registry, _ = make_admin(tmp_path)
+    try:
+        key = requests.post(
+            f'{admin.url}/subscriptions',
+            json={'token': 'secret', 'chat_id': 42}, timeout=1,
+        ).json()['key']
+    finally:
+        admin.stop()
+    (tmp_path / 'subscriptions.json').write_text('[]')
+    registry.reload()
+    assert registry.get(key) is None
+
+
+def test_removed_subscription_comes_back_through_the_file(tmp_path):
+    admin, registry, _ = make_admin(tmp_path)
+    path = tmp_path / 'subscriptions.json'
+    try:
+        url = f'{admin.url}/subscriptions'
+        key = requests.post(
+            url, json={'token': 'secret', 'chat_id': 42}, timeout=1
+        ).json()['key']
+        requests.delete(f'{url}/{key}', timeout=1)
+        default_key = registry.default.key
+        requests.delete(f'{url}/{default_key}', timeout=1)
+    finally:
+        admin.stop()
+    assert path.read_text() == '[]'
+    path.write_text('[{"token": "secret", "chat_id": 42}]')
+    registry.reload()
+    assert registry.get(key) is not None
+    assert registry.get(default_key) is None
@@ -0,0 +1,62 @@
+from analytics import Reviews, format_summary, project_name, review_summary
+from history import HistoryStore, parse_date
+
+HOUR = 3600
+
+
+def record(store, token, homework_id, name, events):
+    for status, date in events:
+        store.record(token, {
+            'id': homework_id,
+            'homework_name': name,
+            'status': status,
+            'date_updated': date,
+        })
+
+
+def test_review_summary(tmp_path):
+    path = str(tmp_path / 'history.sqlite')
+    store = HistoryStore(path)
+    record(store, 'anna', 1, 'anna__hw05_final.zip', [
+        ('reviewing', '2024-01-01T00:00:00Z'),
+        ('rejected', '2024-01-01T02:00:00Z'),
+        ('reviewing', '2024-01-01T03:00:00Z'),
+        ('approved', '2024-01-01T07:00:00Z'),
+    ])
+    record(store, 'boris', 1, 'boris__hw05_final.zip', [
+        ('reviewing', '2024-01-01T01:00:00Z'),
+        ('approved', '2024-01-01T04:00:00Z'),
+    ])
+    record(store, 'boris', 2, 'boris__hw06_api.zip', [
+        ('reviewing', '2024-01-02T00:00:00Z'),
+    ])
+    store.close()
+
+    reviews = Reviews.load(path)
+    assert len(reviews) == 3
+    summary = review_summary(
+        reviews, now=parse_date('2024-01-02T12:00:00Z'), days=2
+    )
+    assert summary['median_turnaround'] == 3 * HOUR
+    assert summary['rejection_rate'] == {'hw05_final': 1 / 3}
+    assert summary['queue_max'] == 2
+    assert summary['queue_now'] == 1
+    assert summary['queue_by_day'] == [0, 1]
+    text = format_summary(summary)
+    assert 'hw05_final: возвратов 33%' in text
+    assert 'Медиана времени проверки: 3.0 ч.' in text
+
+
+def test_empty_history(tmp_path):
+    path = str(tmp_path / 'history.sqlite')
+    HistoryStore(path).close()
+    summary = review_summary(Reviews.load(path))
+    assert summary['reviews'] == 0
+    assert summary['median_turnaround'] is None
+    assert summary['queue_by_day'] == [0] * 7
+    format_summary(summary)
+
+
+def test_project_name():
+    assert project_name('login__hw01_python.zip') == 'hw01_python'
+    assert project_name(None) == 'unknown'
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+import subscriptions
+from clock import SimulationFinished, VirtualClock
+
+DAY = 24 * 3600
+
+
+def test_sleep_moves_time_and_runs_timers_in_order():
+    clock = VirtualClock(start=1000.0)
+    calls = []
+    clock.call_at(20, lambda: calls.append(('late', clock.time())))
+    clock.call_at(10, lambda: calls.append(('early', clock.time())))
+    started = time.monotonic()
+    clock.sleep(15)
+    assert calls == [('early', 1010.0)]
+    clock.sleep(3600)
+    assert calls == [('early', 1010.0), ('late', 1020.0)]
+    assert clock.monotonic() == 3615
+    assert time.monotonic() - started < 1
+
+
+def test_sleep_past_the_end_finishes_simulation():
+    clock = VirtualClock(until=100)
+    clock.sleep(60)
+    with pytest.raises(SimulationFinished):
+        clock.sleep(60)
+    assert clock.elapsed == 100
+
+
+def test_main_runs_a_week_in_virtual_time(monkeypatch, fake_api,
+                                          homework_module):
+    clock = VirtualClock(until=7 * DAY)
+    sent = []
+
+    def respond(from_date):
+        now = int(clock.time())
+        # Раз в день работа меняет статус
+        day = int(clock.elapsed // DAY)
+        changed = now - int(clock.elapsed) % DAY
+        homeworks = [{
+            'id': 1,
+            'homework_name': 'student__hw01.zip',
+            'status': ('reviewing', 'rejected')[day % 2],
+            'date_updated': f'day {day}',
+        }] if changed >= from_date else []
+        return {'homeworks': homeworks, 'current_date': now}
+
+    class FakeBot:
+        def __init__(self, token):
+            self.token = token
+
+        def send_message(self, chat_id, text):
+            sent.append((clock.elapsed, text))
+
+    fake_api.respond = respond
+    monkeypatch.setattr(homework_module.telegram, 'Bot', FakeBot)
+    started = time.monotonic()
+    with clock.installed(homework_module, subscriptions):
+        with pytest.raises(SimulationFinished):
+            homework_module.main()
+    assert time.monotonic() - started < 1.5
+    # Циклы в моменты 0, 600, ..., 7 дней включительно
+    assert clock.sleeps == 7 * DAY // homework_module.RETRY_PERIOD + 1
+    assert len(fake_api.requested) == clock.sleeps
+    # Об изменении каждого из восьми дней сообщено ровно один раз
+    assert [moment // DAY for moment, _ in sent] == list(range(8))
+
+
+def test_cycle_errors_do_not_stop_the_bot(monkeypatch, fake_api,
+                                          homework_module):
+    from lifecycle import CheckpointStore
+
+    def no_space(self, cursors):
+        raise OSError(28, 'No space left on device')
+
+    class FakeBot:
+        def __init__(self, token):
+            self.token = token
+
+        def send_message(self, chat_id, text):
+            pass
+
+    clock = VirtualClock(until=3 * homework_module.RETRY_PERIOD)
+    fake_api.respond = lambda from_date: {
+        'homeworks': [], 'current_date': int(clock.time()),
+    }
+    monkeypatch.setattr(homework_module.telegram, 'Bot', FakeBot)
+    monkeypatch.setattr(CheckpointStore, 'save', no_space)
+    with clock.installed(homework_module, subscriptions):
+        with pytest.raises(SimulationFinished):
+            homework_module.main()
+    assert clock.sleeps == 4
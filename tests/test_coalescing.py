@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+from coalescing import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    results = []
+
+    def slow_call():
+        started.set()
+        release.wait(1)
+        return ['hw']
+
+    def worker():
+        results.append(flights.do('token', slow_call))
+
+    leader = threading.Thread(target=worker)
+    leader.start()
+    started.wait(1)
+    followers = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in followers:
+        thread.start()
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(1)
+    assert flights.calls == 1
+    assert results == [['hw']] * 6
+
+
+def test_result_is_reused_within_ttl():
+    now = [0]
+    flights = SingleFlight(ttl=60, clock=lambda: now[0])
+    assert flights.do('key', lambda: 1) == 1
+    assert flights.do('key', lambda: 2) == 1
+    now[0] = 61
+    assert flights.do('key', lambda: 3) == 3
+    assert flights.calls == 2
+
+
+def test_errors_are_not_cached():
+    flights = SingleFlight(ttl=60)
+
+    def failing():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError):
+        flights.do('key', failing)
+    assert flights.do('key', lambda: 'ok') == 'ok'
+
+
+def test_subscriptions_of_one_token_share_request(fake_api, homework_module):
+    from subscriptions import Subscription
+
+    flights = SingleFlight(ttl=60)
+    student = Subscription('token', 1, cursor=1000000030)
+    mentor = Subscription('token', 2, cursor=1000000050)
+    for subscription in (student, mentor):
+        homework_module.fetch_homeworks(subscription, flights)
+    # Курсоры минус запас CURSOR_OVERLAP попадают в одно окно
+    assert fake_api.requested == [999999960]
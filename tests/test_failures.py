@@ -0,0 +1,84 @@
+from failures import (
+    FAILURE, FAILURE_RECOVERED, OUTAGE, OUTAGE_RECOVERED, FailureTracker,
+)
+from subscriptions import Subscription
+
+
+def test_failure_is_reported_on_first_occurrence_and_recovery():
+    tracker = FailureTracker()
+    subscription = Subscription('token', 1)
+    assert tracker.failed(subscription, ConnectionError('refused'))
+    assert [
+        (notice.state, notice.chat_id, notice.error)
+        for notice in tracker.notices()
+    ] == [(FAILURE, '1', 'ConnectionError: refused')]
+    for _ in range(4):
+        assert not tracker.failed(subscription, ConnectionError('refused'))
+    assert tracker.notices() == []
+    tracker.succeeded(subscription)
+    [notice] = tracker.notices()
+    assert (notice.state, notice.count) == (FAILURE_RECOVERED, 5)
+    assert tracker.report()['open'] == []
+
+
+def test_outage_sends_one_summary_whatever_the_fleet_size():
+    tracker = FailureTracker(fanout=3)
+    fleet = [Subscription(f'token-{number}', number) for number in range(50)]
+    for _ in range(3):
+        for subscription in fleet:
+            tracker.failed(subscription, TimeoutError('read timed out'))
+        notices = tracker.notices()
+    assert notices == []
+    for subscription in fleet:
+        tracker.succeeded(subscription)
+    [notice] = tracker.notices()
+    assert notice.state == OUTAGE_RECOVERED and notice.chat_id is None
+    assert (notice.count, notice.subscriptions) == (150, 50)
+
+
+def test_recovery_follows_how_the_failure_was_reported():
+    tracker = FailureTracker(fanout=1)
+    fleet = [Subscription(f'token-{number}', number) for number in range(3)]
+    for subscription in fleet:
+        tracker.failed(subscription, TimeoutError('read timed out'))
+    [notice] = tracker.notices()
+    assert notice.state == OUTAGE
+    lone = Subscription('lone', 9)
+    tracker.failed(lone, TimeoutError('read timed out'))
+    assert [notice.chat_id for notice in tracker.notices()] == ['9']
+    for subscription in (fleet[0], lone):
+        tracker.succeeded(subscription)
+    assert [
+        (notice.state, notice.chat_id, notice.subscriptions)
+        for notice in tracker.notices()
+    ] == [(OUTAGE_RECOVERED, None, 1), (FAILURE_RECOVERED, '9', 1)]
+    for subscription in fleet[1:]:
+        tracker.succeeded(subscription)
+    [notice] = tracker.notices()
+    assert (notice.state, notice.chat_id, notice.subscriptions) == (
+        OUTAGE_RECOVERED, None, 2
+    )
+
+
+def test_outage_notice_and_bounded_error_log():
+    tracker = FailureTracker(capacity=10, fanout=1, text_limit=20)
+    fleet = [Subscription(f'token-{number}', number) for number in range(2)]
+    for subscription in fleet:
+        tracker.failed(subscription, ValueError('x' * 1000))
+    [notice] = tracker.notices()
+    assert (notice.state, notice.subscriptions) == (OUTAGE, 2)
+    assert len(notice.error) == len('ValueError: ') + 20
+    for _ in range(20):
+        tracker.failed(fleet[0], KeyError('status'))
+    report = tracker.report(limit=3)
+    assert len(report['recent']) == 3
+    assert report['counts'] == {'ValueError': 2, 'KeyError': 20}
+    assert len(report['open']) == 3
+
+
+def test_short_failure_is_not_reported():
+    tracker = FailureTracker()
+    subscription = Subscription('token', 1)
+    tracker.failed(subscription, ConnectionError('reset'))
+    tracker.succeeded(subscription)
+    assert tracker.notices() == []
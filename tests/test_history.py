@@ -0,0 +1,63 @@
+from history import HistoryStore, parse_date
+
+
+def homework(status, date, homework_id=1, comment=''):
+    return {
+        'id': homework_id,
+        'homework_name': f'student__hw{homework_id:02d}.zip',
+        'status': status,
+        'date_updated': date,
+        'reviewer_comment': comment,
+    }
+
+
+def test_writes_are_batched_until_flush(tmp_path):
+    path = str(tmp_path / 'history.sqlite')
+    store = HistoryStore(path)
+    store.record('token', homework('reviewing', '2024-01-01T10:00:00Z'))
+    assert HistoryStore(path).transitions() == []
+    assert store.flush() == 1
+    assert len(HistoryStore(path).transitions()) == 1
+
+
+def test_duplicate_transitions_are_ignored(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.sqlite'))
+    for _ in range(3):
+        store.record('token', homework('reviewing', '2024-01-01T10:00:00Z'))
+    assert store.flush() == 3
+    assert len(store.transitions()) == 1
+
+
+def test_review_durations_and_rejections(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.sqlite'))
+    store.record('token', homework('reviewing', '2024-01-01T10:00:00Z'))
+    store.record(
+        'token',
+        homework('rejected', '2024-01-02T10:00:00Z', comment='Поправьте'),
+        old_status='reviewing',
+    )
+    store.record('token', homework('reviewing', '2024-01-03T10:00:00Z'))
+    store.record(
+        'token', homework('approved', '2024-01-04T10:00:00Z'), 'reviewing'
+    )
+    store.record('token', homework('reviewing', '2024-01-04T11:00:00Z', 2))
+    durations = store.review_durations()
+    assert [row['duration'] for row in durations] == [3 * 24 * 3600]
+    assert durations[0]['homework_name'] == 'student__hw01.zip'
+
+    rejections = store.transitions(
+        status='rejected', since=parse_date('2024-01-01T00:00:00Z'),
+        token='token',
+    )
+    assert len(rejections) == 1
+    assert rejections[0]['old_status'] == 'reviewing'
+    assert rejections[0]['reviewer_comment'] == 'Поправьте'
+    assert rejections[0]['token'] != 'token'
+    assert store.transitions(status='rejected', token='other') == []
+
+
+def test_store_without_path_records_nothing():
+    store = HistoryStore()
+    store.record('token', homework('approved', None))
+    assert store.flush() == 0
+    store.close()
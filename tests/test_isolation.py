@@ -0,0 +1,127 @@
+import threading
+
+from coalescing import SingleFlight
+from isolation import Bulkhead
+from scheduling import PollScheduler
+from subscriptions import Subscription
+from utils import FakeClock
+
+
+def test_failing_subscription_backs_off_alone():
+    clock = FakeClock()
+    bulkhead = Bulkhead(backoff_base=600, backoff_max=1200, clock=clock)
+    scheduler = PollScheduler(clock=clock)
+    broken, healthy = Subscription('broken', 1), Subscription('healthy', 2)
+
+    def poll(subscription):
+        if subscription is broken:
+            raise RuntimeError('unexpected response')
+        return True
+
+    polled, history = [], []
+    for _ in range(4):
+        for subscription in scheduler.plan([broken, healthy]):
+            polled.append(subscription)
+            assert bulkhead.run(subscription, poll)
+        history.append((
+            broken.failures, max(broken.retry_at - clock.now, 0)
+        ))
+        clock.now += 600
+    # Первый сбой повторяется в следующем цикле, дальше пауза удваивается,
+    # а в четвёртом цикле сломанная подписка пропускается
+    assert history == [(1, 0), (2, 600), (3, 1200), (3, 600)]
+    assert polled.count(healthy) == 4 and polled.count(broken) == 3
+    assert broken.last_error == 'unexpected response'
+    assert healthy.failures == 0
+    clock.now = broken.retry_at
+    bulkhead.run(broken, lambda subscription: True)
+    assert (broken.failures, broken.retry_at) == (0, 0)
+
+
+def test_subscription_is_polled_once_at_a_time():
+    bulkhead = Bulkhead(in_flight=1)
+    stuck, other = Subscription('stuck', 1), Subscription('other', 2)
+    twin = Subscription('stuck', 3)
+    entered, release = threading.Event(), threading.Event()
+
+    def hang(subscription):
+        entered.set()
+        release.wait(1)
+        return True
+
+    worker = threading.Thread(target=bulkhead.run, args=(stuck, hang))
+    worker.start()
+    try:
+        assert entered.wait(1)
+        assert not bulkhead.run(stuck, lambda subscription: True)
+        assert bulkhead.run(twin, lambda subscription: True)
+        assert bulkhead.run(other, lambda subscription: True)
+    finally:
+        release.set()
+        worker.join()
+    assert bulkhead.rejected == 1
+    assert bulkhead.run(stuck, lambda subscription: True)
+
+
+def test_shared_request_is_awaited_within_budget():
+    bulkhead = Bulkhead(timeout=0.2)
+    flights = SingleFlight()
+    stuck, twin = Subscription('stuck', 1), Subscription('stuck', 2)
+    entered, release = threading.Event(), threading.Event()
+
+    def hang():
+        entered.set()
+        release.wait(1)
+        return True
+
+    def poll(subscription):
+        return flights.do(subscription.token, hang)
+
+    worker = threading.Thread(target=bulkhead.run, args=(stuck, poll))
+    worker.start()
+    try:
+        assert entered.wait(1)
+        assert bulkhead.run(twin, poll)
+    finally:
+        release.set()
+        worker.join()
+    assert flights.calls == 1
+    assert 'budget' in twin.last_error and twin.failures == 1
+    assert stuck.last_error is None
+
+
+def test_throttled_token_is_deferred_within_budget(monkeypatch, fresh_tokens,
+                                                   homework_module):
+    from outbox import Outbox
+    from ratelimit import RateLimiter
+    from transport import FakeTransport
+
+    class RecordingTransport(FakeTransport):
+        def get_json(self, url, headers, params, timeout=None):
+            self.timeouts.append(timeout)
+            return super().get_json(url, headers, params, timeout)
+
+    def sleep(seconds):
+        raise AssertionError(f'slept {seconds}s outside the budget')
+
+    transport = RecordingTransport()
+    transport.timeouts = []
+    limiter = RateLimiter(100, 10, 1, 1, sleep=sleep)
+    limiter.retry_after('OAuth slow', 3600)
+    monkeypatch.setattr(homework_module, 'TRANSPORT', transport)
+    monkeypatch.setattr(homework_module, 'RATE_LIMITER', limiter)
+    bulkhead = Bulkhead(timeout=5)
+    slow = Subscription('slow', 1, cursor=1000000000)
+    fast = Subscription('fast', 2, cursor=1000000000)
+    for subscription in (slow, fast):
+        bulkhead.run(subscription, lambda subscription: (
+            homework_module.poll_subscription(
+                subscription, SingleFlight(), Outbox()
+            )
+        ))
+    assert 'budget' in slow.last_error and slow.failures == 0
+    assert fast.last_error is None
+    assert [call[1]['Authorization'] for call in transport.calls] == [
+        'OAuth fast'
+    ]
+    assert 0 < transport.timeouts[0] <= 5
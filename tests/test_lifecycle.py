@@ -0,0 +1,64 @@
+import json
+import os
+import signal
+
+from lifecycle import CheckpointStore, Lifecycle
+from subscriptions import Subscription, SubscriptionRegistry
+
+
+def test_reload_keeps_cursors_of_remaining_subscriptions(tmp_path):
+    path = tmp_path / 'subscriptions.json'
+    path.write_text(json.dumps([{'token': 'a', 'chat_id': 1}]))
+    registry = SubscriptionRegistry(path=str(path))
+    registry.restore_cursors({}, default=100)
+    path.write_text(json.dumps([
+        {'token': 'a', 'chat_id': 1},
+        {'token': 'b', 'chat_id': 2},
+    ]))
+    registry.reload()
+    registry.restore_cursors({}, default=200)
+    cursors = sorted(registry.cursors().values())
+    assert cursors == [100, 200], (
+        'Перезагрузка не должна сбрасывать курсоры оставшихся подписок.'
+    )
+
+
+def test_checkpoint_roundtrip(tmp_path):
+    store = CheckpointStore(str(tmp_path / 'cursors.json'))
+    store.save({'1:abc': 123})
+    assert store.load() == {'1:abc': 123}
+    assert not os.path.exists(f'{store.path}.tmp')
+
+
+def test_checkpoint_restores_cursor():
+    subscription = Subscription('token', 1)
+    registry = SubscriptionRegistry(default=subscription)
+    registry.restore_cursors({subscription.key: 42}, default=0)
+    assert subscription.cursor == 42
+
+
+def test_stop_signal_interrupts_sleep_only():
+    lifecycle = Lifecycle()
+    lifecycle.install()
+    try:
+        with lifecycle.sleeping():
+            os.kill(os.getpid(), signal.SIGTERM)
+            raise AssertionError('Сигнал остановки должен прервать ожидание.')
+        assert lifecycle.stop_requested
+        lifecycle.stop_requested = False
+        os.kill(os.getpid(), signal.SIGHUP)
+        assert lifecycle.reload_requested
+    finally:
+        lifecycle.uninstall()
+
+
+def test_stop_signal_before_sleep_skips_it():
+    lifecycle = Lifecycle()
+    lifecycle.install()
+    try:
+        os.kill(os.getpid(), signal.SIGTERM)
+        with lifecycle.sleeping() as may_sleep:
+            assert not may_sleep
+        assert lifecycle.stop_requested
+    finally:
+        lifecycle.uninstall()
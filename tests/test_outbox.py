@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+
+from exceptions import MessageRejectedError
+from outbox import MESSAGE_LIMIT, Outbox
+
+
+class Recorder:
+    def __init__(self, results=()):
+        self.results = list(results)
+        self.sent = []
+
+    def __call__(self, chat_id, text):
+        self.sent.append((chat_id, text))
+        return self.results.pop(0) if self.results else True
+
+
+def test_pending_messages_survive_restart(tmp_path):
+    path = str(tmp_path / 'outbox.log')
+    outbox = Outbox(path)
+    outbox.put(1, 'first', key='a')
+    outbox.put(1, 'second', key='b')
+    outbox.close()
+
+    restored = Outbox(path)
+    assert [message.key for message in restored.pending()] == ['a', 'b']
+    assert restored.drain(Recorder()) == 2
+    restored.close()
+    assert len(Outbox(path)) == 0
+
+
+def test_duplicate_keys_are_ignored(tmp_path):
+    outbox = Outbox(str(tmp_path / 'outbox.log'))
+    assert outbox.put(1, 'status', key='hw:approved')
+    assert not outbox.put(1, 'status', key='hw:approved')
+    outbox.drain(Recorder())
+    assert not outbox.put(1, 'status', key='hw:approved')
+
+
+def test_failed_chat_is_retried_in_order_with_backoff():
+    now = [0]
+    outbox = Outbox(clock=lambda: now[0])
+    outbox.put(1, 'first')
+    outbox.put(2, 'other chat')
+    sender = Recorder(results=[False, True])
+    assert outbox.drain(sender) == 1
+    assert outbox.drain(sender) == 0
+    now[0] = 1
+    outbox.put(1, 'second')
+    assert outbox.drain(sender) == 2
+    assert sender.sent[-1] == ('1', 'first\n\nsecond')
+
+
+def test_batches_respect_message_limit():
+    outbox = Outbox()
+    for _ in range(3):
+        outbox.put(1, 'x' * (MESSAGE_LIMIT // 2 - 10))
+    sender = Recorder()
+    assert outbox.drain(sender) == 3
+    assert len(sender.sent) == 2
+
+
+def test_compaction_keeps_only_pending(tmp_path):
+    path = str(tmp_path / 'outbox.log')
+    outbox = Outbox(path, compact_after=0)
+    for index in range(10):
+        outbox.put(1, f'message {index}')
+    outbox.drain(Recorder())
+    outbox.put(1, 'left')
+    outbox.compact()
+    with open(path, encoding='utf-8') as file:
+        records = [json.loads(line) for line in file]
+    assert [record['op'] for record in records] == ['ack'] * 10 + ['put']
+    outbox.close()
+
+
+def test_delivered_keys_survive_compaction_and_restart(tmp_path):
+    path = str(tmp_path / 'outbox.log')
+    outbox = Outbox(path, compact_after=1)
+    outbox.put(1, 'status', key='k1')
+    outbox.drain(Recorder())
+    outbox.compact()
+    outbox.close()
+    assert not Outbox(path).put(1, 'status', key='k1')
+
+
+def test_close_waits_for_compaction(tmp_path):
+    path = str(tmp_path / 'outbox.log')
+    outbox = Outbox(path, compact_after=0)
+    outbox.put(1, 'first')
+    outbox.drain(Recorder())
+    outbox.close()
+    outbox.compact()
+    assert not os.path.exists(f'{path}.tmp')
+    assert Outbox(path).put(1, 'second')
+
+
+def test_long_text_is_split_at_message_limit():
+    outbox = Outbox()
+    text = '\n'.join(['x' * 100] * 100)
+    assert outbox.put(1, text, key='long')
+    assert [message.key for message in outbox.pending()] == [
+        'long', 'long.1', 'long.2'
+    ]
+    sender = Recorder()
+    assert outbox.drain(sender) == 3
+    assert all(len(sent) <= MESSAGE_LIMIT for _, sent in sender.sent)
+    assert '\n'.join(sent for _, sent in sender.sent) == text
+
+
+def test_rejected_message_is_dropped_without_retry():
+    outbox = Outbox()
+    outbox.put(1, 'first')
+    outbox.put(1, 'broken')
+    outbox.put(1, 'last')
+    sent = []
+
+    def send(chat_id, text):
+        if 'broken' in text:
+            raise MessageRejectedError('Bad Request: can\'t parse entities')
+        sent.append(text)
+        return True
+
+    assert outbox.drain(send) == 2
+    assert sent == ['first', 'last'] and len(outbox) == 0
+
+
+def test_chats_are_sent_concurrently_in_order():
+    barrier = threading.Barrier(3, timeout=1)
+    sent = []
+
+    def send(chat_id, text):
+        if text.startswith('first'):
+            barrier.wait()
+        sent.append((chat_id, text))
+        return True
+
+    outbox = Outbox(concurrency=3)
+    for chat_id in (1, 2, 3):
+        outbox.put(chat_id, 'first' + 'x' * (MESSAGE_LIMIT - 10))
+        outbox.put(chat_id, 'second')
+    assert outbox.drain(send) == 6
+    for chat_id in ('1', '2', '3'):
+        texts = [text[:6] for chat, text in sent if chat == chat_id]
+        assert texts == ['firstx', 'second']
+
@@ -0,0 +1,68 @@
+import pytest
+
+from exceptions import BudgetExceededError
+from ratelimit import RateLimiter, parse_retry_after
+from utils import FakeClock
+
+
+def make_limiter(clock, **kwargs):
+    limits = dict(rate=10, burst=5, token_rate=1, token_burst=2)
+    limits.update(kwargs)
+    return RateLimiter(clock=clock, sleep=clock.sleep, **limits)
+
+
+def test_token_bucket_allows_burst_then_spaces_requests():
+    clock = FakeClock(1000.0)
+    limiter = make_limiter(clock)
+    delays = [limiter.acquire('a') for _ in range(4)]
+    assert delays == [0, 0, 1, 1]
+
+
+def test_tokens_do_not_share_their_buckets():
+    clock = FakeClock(1000.0)
+    limiter = make_limiter(clock)
+    limiter.acquire('a')
+    limiter.acquire('a')
+    assert limiter.reserve('b') == (0, True)
+
+
+def test_global_bucket_limits_all_tokens():
+    clock = FakeClock(1000.0)
+    limiter = make_limiter(clock, rate=2, burst=1, token_burst=10)
+    assert limiter.reserve('a') == (0, True)
+    assert limiter.reserve('b') == (0.5, True)
+    assert limiter.reserve('c') == (1.0, True)
+
+
+def test_slot_beyond_budget_is_not_reserved():
+    clock = FakeClock(1000.0)
+    limiter = make_limiter(clock, rate=2, burst=1, token_burst=10)
+    limiter.acquire('a')
+    with pytest.raises(BudgetExceededError):
+        limiter.acquire('b', max_wait=0.1)
+    assert clock.now == 1000.0
+    assert limiter.reserve('c') == (0.5, True)
+
+
+def test_sustained_throughput_matches_limit():
+    clock = FakeClock(1000.0)
+    limiter = make_limiter(clock, rate=5, burst=1, token_burst=100)
+    start = clock.now
+    for index in range(100):
+        limiter.acquire(f'token-{index}')
+    assert abs((clock.now - start) - 99 / 5) < 1e-6
+
+
+def test_retry_after_blocks_token():
+    clock = FakeClock(1000.0)
+    limiter = make_limiter(clock)
+    limiter.retry_after('a', 30)
+    assert limiter.reserve('a') == (30, False)
+    assert limiter.reserve('b') == (0, True)
+    assert limiter.acquire('a') == 30
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('7') == 7
+    assert parse_retry_after(None, default=60) == 60
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0
@@ -0,0 +1,51 @@
+from scheduling import PollScheduler
+from subscriptions import Subscription
+
+WEEK = 7 * 24 * 3600
+
+
+def make_subscription(chat_id, status=None, last_change=0):
+    subscription = Subscription(f'token-{chat_id}', chat_id)
+    if status:
+        subscription.statuses['hw'] = (status, None)
+    subscription.last_change = last_change
+    return subscription
+
+
+def test_reviewing_first_and_dormant_rarely():
+    scheduler = PollScheduler(dormant_every=3, clock=lambda: WEEK + 10)
+    dormant = make_subscription(1, 'approved')
+    normal = make_subscription(2, 'approved', last_change=WEEK)
+    active = make_subscription(3, 'reviewing')
+    subscriptions = [dormant, normal, active]
+    assert scheduler.plan(subscriptions) == [active, normal]
+    assert scheduler.plan(subscriptions) == [active, normal]
+    assert scheduler.plan(subscriptions) == [active, normal, dormant]
+
+
+def test_overload_skips_dormant():
+    scheduler = PollScheduler(dormant_every=1, clock=lambda: WEEK + 10)
+    dormant = make_subscription(1, 'approved')
+    active = make_subscription(2, 'reviewing')
+    assert scheduler.plan([dormant, active], overloaded=True) == [active]
+
+
+def test_queue_is_bounded_and_shedding_is_counted():
+    scheduler = PollScheduler(capacity=2, clock=lambda: 10)
+    subscriptions = [make_subscription(chat_id) for chat_id in range(5)]
+    subscriptions[4].statuses['hw'] = ('reviewing', None)
+    planned = scheduler.plan(subscriptions)
+    assert planned[0] is subscriptions[4]
+    assert len(planned) == 2
+    assert scheduler.shed_total == 3
+
+
+def test_least_recently_polled_go_first_within_class():
+    now = [10]
+    scheduler = PollScheduler(capacity=1, clock=lambda: now[0])
+    first = make_subscription(1, last_change=10)
+    second = make_subscription(2, last_change=10)
+    assert scheduler.plan([first, second]) == [first]
+    scheduler.polled(first)
+    now[0] = 20
+    assert scheduler.plan([first, second]) == [second]
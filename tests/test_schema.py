@@ -0,0 +1,56 @@
+import pytest
+
+from schema import Validator
+
+VERDICTS = {'approved': 'ok'}
+SCHEMA = {
+    'type': dict,
+    'fields': {
+        'homeworks': {'type': list, 'items': {
+            'type': dict,
+            'fields': {'status': {'type': str, 'choices': VERDICTS}},
+        }},
+        'current_date': {'type': int},
+    },
+}
+
+
+def test_valid_value_has_no_problems():
+    validator = Validator(SCHEMA)
+    response = {'homeworks': [{'status': 'approved'}], 'current_date': 1}
+    assert validator.problems(response) == []
+    assert validator.ensure(response) is response
+
+
+def test_all_problems_are_collected_in_one_pass():
+    problems = Validator(SCHEMA).problems({'homeworks': [
+        {'status': 'approved'}, {}, {'status': 'lost'}, [],
+    ]})
+    assert [
+        (problem.path, problem.error) for problem in problems
+    ] == [
+        (('homeworks', 1, 'status'), KeyError),
+        (('homeworks', 2, 'status'), KeyError),
+        (('homeworks', 3), TypeError),
+        (('current_date',), KeyError),
+    ]
+
+
+def test_ensure_raises_the_first_problem():
+    validator = Validator(SCHEMA)
+    with pytest.raises(TypeError) as error:
+        validator.ensure({'homeworks': {}, 'current_date': 'now'})
+    assert 'homeworks: expected list, got dict' in str(error.value)
+    assert 'current_date: expected int, got str' in str(error.value)
+    assert len(error.value.problems) == 2
+
+
+def test_choices_follow_their_dict():
+    validator = Validator(SCHEMA)
+    response = {'homeworks': [{'status': 'rejected'}], 'current_date': 1}
+    assert validator.problems(response)
+    VERDICTS['rejected'] = 'fix it'
+    try:
+        assert validator.problems(response) == []
+    finally:
+        del VERDICTS['rejected']
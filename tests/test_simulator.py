@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+import requests
+import telegram
+
+from simulator import LatencyModel, Simulator
+from utils import FakeClock
+
+
+def get_statuses(simulator, token, from_date):
+    return requests.get(
+        simulator.practicum_url,
+        headers={'Authorization': f'OAuth {token}'},
+        params={'from_date': from_date},
+        timeout=1,
+    )
+
+
+def test_statuses_follow_from_date():
+    clock = FakeClock()
+    with Simulator(clock=clock, mean_transition=60) as simulator:
+        clock.now += 24 * 3600
+        everything = get_statuses(simulator, 'student', 0).json()
+        assert everything['current_date'] == int(clock.now)
+        assert everything['homeworks']
+        statuses = {hw['status'] for hw in everything['homeworks']}
+        assert statuses <= {'reviewing', 'approved', 'rejected'}
+        delta = get_statuses(simulator, 'student', int(clock.now)).json()
+        assert delta['homeworks'] == []
+
+
+def test_unknown_token_and_injected_errors():
+    with Simulator(tokens=['good']) as simulator:
+        response = get_statuses(simulator, 'bad', 0)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+    with Simulator(error_rate=1) as simulator:
+        response = get_statuses(simulator, 'good', 0)
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert simulator.stats['errors'] == 1
+
+
+def test_fake_bot_api_records_messages():
+    with Simulator() as simulator:
+        bot = telegram.Bot(
+            token='1234:abcdefg', base_url=simulator.telegram_url
+        )
+        message = bot.send_message(chat_id=12345, text='Работа проверена')
+        assert message.text == 'Работа проверена'
+        assert simulator.messages == [('12345', 'Работа проверена')]
+
+
+def test_latency_model_distributions():
+    assert LatencyModel('fixed:0.25').sample() == 0.25
+    samples = [LatencyModel('uniform:0.1,0.2', seed=1).sample()]
+    assert 0.1 <= samples[0] <= 0.2
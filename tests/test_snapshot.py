@@ -0,0 +1,88 @@
+import os
+
+from outbox import Outbox
+from snapshot import SnapshotStore
+from subscriptions import Subscription, SubscriptionRegistry
+
+
+def make_state():
+    registry = SubscriptionRegistry()
+    subscription = registry.add(Subscription('token', 1, cursor=1700000000))
+    subscription.statuses[123] = ('reviewing', '2024-01-01T00:00:00Z')
+    subscription.statuses['hw01.zip'] = ('approved', None)
+    subscription.statuses[2 ** 64] = ('approved', None)
+    subscription.paused = True
+    subscription.skipped = 2
+    subscription.failures = 3
+    subscription.retry_at = 1700001200.5
+    # Курсор ещё не восстановлен, как у подписки из файла при старте
+    registry.add(Subscription('другой', 2)).cursor = None
+    outbox = Outbox()
+    outbox.put(1, 'Работа взята на проверку', key='1:123:reviewing')
+    return registry, outbox
+
+
+def test_snapshot_roundtrip(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'state.snapshot'))
+    store.save(*make_state())
+    assert not os.path.exists(f'{store.path}.tmp')
+    # В снимке лежат токены
+    assert os.stat(store.path).st_mode & 0o777 == 0o600
+
+    registry, outbox = SubscriptionRegistry(), Outbox()
+    assert store.restore(registry, outbox) == 2
+    restored = registry.get(Subscription('token', 1).key)
+    assert restored.cursor == 1700000000
+    assert restored.statuses == {
+        123: ('reviewing', '2024-01-01T00:00:00Z'),
+        'hw01.zip': ('approved', None),
+        2 ** 64: ('approved', None),
+    }
+    assert restored.paused and restored.skipped == 2
+    assert (restored.failures, restored.retry_at) == (3, 1700001200.5)
+    assert registry.get(Subscription('другой', 2).key).cursor is None
+    [message] = outbox.pending()
+    assert (message.key, message.chat_id, message.text) == (
+        '1:123:reviewing', '1', 'Работа взята на проверку'
+    )
+    # Сообщение, уже восстановленное из журнала очереди, не задваивается
+    store.restore(registry, outbox)
+    assert len(outbox) == 1
+
+
+def test_file_registry_is_not_extended(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'state.snapshot'))
+    store.save(*make_state())
+    subscriptions = tmp_path / 'subscriptions.json'
+    subscriptions.write_text('[{"token": "token", "chat_id": 1}]')
+    registry = SubscriptionRegistry(path=str(subscriptions))
+    assert store.restore(registry, Outbox()) == 1
+    assert len(registry) == 1
+
+
+def test_damaged_snapshot_is_ignored(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'state.snapshot'))
+    store.save(*make_state())
+    data = bytearray(open(store.path, 'rb').read())
+    data[-1] ^= 0xFF
+    with open(store.path, 'wb') as file:
+        file.write(data)
+    registry = SubscriptionRegistry()
+    assert store.restore(registry, Outbox()) == 0
+    assert len(registry) == 0
+
+
+def test_snapshots_are_periodic(tmp_path):
+    now = [0]
+    store = SnapshotStore(
+        str(tmp_path / 'state.snapshot'), interval=60, clock=lambda: now[0]
+    )
+    registry, outbox = make_state()
+    store.maybe_save(registry, outbox)
+    os.remove(store.path)
+    now[0] = 59
+    store.maybe_save(registry, outbox)
+    assert not os.path.exists(store.path)
+    now[0] = 60
+    store.maybe_save(registry, outbox)
+    assert os.path.exists(store.path)
@@ -0,0 +1,43 @@
+import inspect
+
+import pytest
+
+import soak
+
+HALF_DAY = 12 * 3600
+
+
+@pytest.fixture(autouse=True)
+def unwrapped_main(monkeypatch):
+    # test_bot оборачивает homework.main проверкой тайм-аута до конца сессии
+    import homework
+    monkeypatch.setattr(homework, 'main', inspect.unwrap(homework.main))
+
+
+@pytest.mark.timeout(60)
+def test_polling_loop_memory_stays_flat():
+    report = soak.run(
+        days=0.5, subscriptions_count=2, samples=4,
+        mean_transition=HALF_DAY,
+    )
+    assert report.cycles == 73
+    assert len(report.samples) == 4
+    assert report.growth_per_cycle < 256, '\n'.join(map(str, report.top))
+
+
+@pytest.mark.timeout(60)
+def test_soak_detects_growth(monkeypatch):
+    import homework
+    leaked = []
+    run_cycle = homework.run_cycle
+
+    def leaking_cycle(runtime):
+        leaked.append(bytearray(1024))
+        return run_cycle(runtime)
+
+    monkeypatch.setattr(homework, 'run_cycle', leaking_cycle)
+    report = soak.run(
+        days=0.5, subscriptions_count=1, samples=4,
+        mean_transition=HALF_DAY,
+    )
+    assert report.growth_per_cycle > 1000
@@ -0,0 +1,22 @@
+import telegram
+
+from telegram_client import configure_bot
+
+
+def test_configure_bot_sets_pool():
+    bot = configure_bot(
+        telegram.Bot(token='1234:abcdefg'), pool_size=16, read_timeout=2
+    )
+    assert bot.request.con_pool_size == 16
+
+
+def test_failed_send_is_logged_without_traceback(caplog, homework_module):
+    class DownBot:
+        def send_message(self, chat_id, text):
+            raise telegram.error.NetworkError('Bad Gateway')
+
+    assert not homework_module.send_message(DownBot(), 'text')
+    [record] = [
+        record for record in caplog.records if record.levelname == 'ERROR'
+    ]
+    assert 'Bad Gateway' in record.getMessage() and record.exc_info is None
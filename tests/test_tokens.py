@@ -0,0 +1,64 @@
+import pytest
+
+from exceptions import UnauthorizedError
+from tokens import QUARANTINED, VALID, TokenManager
+from utils import FakeClock
+
+
+def test_token_is_probed_once_and_headers_are_cached():
+    probes = []
+    tokens = TokenManager(probe=probes.append)
+    headers = tokens.headers('token')
+    assert headers == {'Authorization': 'OAuth token'}
+    assert tokens.usable('token') and tokens.usable('token')
+    assert probes == [headers]
+    assert tokens.headers('token') is headers
+    assert tokens.status('token') == VALID
+
+
+def test_rejected_token_is_quarantined_with_backoff():
+    clock = FakeClock()
+
+    def probe(headers):
+        raise UnauthorizedError('401')
+
+    tokens = TokenManager(probe=probe, quarantine=600, clock=clock)
+    with pytest.raises(UnauthorizedError):
+        tokens.usable('revoked')
+    assert tokens.reject('revoked') is True
+    # Параллельный отказ не продлевает карантин и не шумит повторно
+    assert tokens.reject('revoked') is False
+    assert tokens.status('revoked') == QUARANTINED
+    assert not tokens.usable('revoked')
+    clock.now += 600
+    assert tokens.usable('revoked')
+    assert tokens.reject('revoked') is False
+    clock.now += 600
+    assert not tokens.usable('revoked')
+    clock.now += 600
+    tokens.accept('revoked')
+    assert tokens.status('revoked') == VALID
+
+
+def test_revoked_token_is_reported_once(monkeypatch, fake_api,
+                                        homework_module):
+    from coalescing import SingleFlight
+    from outbox import Outbox
+    from subscriptions import Subscription
+
+    def reject(from_date):
+        raise UnauthorizedError('Token rejected')
+
+    fake_api.respond = reject
+    monkeypatch.setattr(homework_module, 'TOKENS', TokenManager(
+        probe=lambda headers: fake_api(headers, 0)
+    ))
+    outbox = Outbox()
+    subscription = Subscription('revoked', 1, cursor=1000000000)
+    for _ in range(3):
+        homework_module.poll_subscription(
+            subscription, SingleFlight(), outbox
+        )
+    assert fake_api.requested == [0]
+    assert len(outbox) == 1
+    assert subscription.last_error == 'token is quarantined'
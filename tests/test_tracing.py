@@ -0,0 +1,67 @@
+import json
+import os
+
+import tracing
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def shutdown(self):
+        pass
+
+
+def test_disabled_tracer_returns_shared_noop_span():
+    tracer = tracing.Tracer()
+    assert tracer.span('poll') is tracing.NOOP_SPAN
+
+
+def test_child_spans_share_trace_and_record_errors():
+    exporter = ListExporter()
+    tracer = tracing.Tracer(exporter)
+    try:
+        with tracer.span('poll', subscription='1:abc'):
+            with tracer.span('practicum.request'):
+                raise ValueError('timeout')
+    except ValueError:
+        pass
+    child, root = exporter.spans
+    assert child.trace_id == root.trace_id
+    assert child.parent_id == root.span_id
+    assert child.to_otlp()['status']['code'] == tracing.STATUS_ERROR
+    assert root.end >= child.end >= child.start >= root.start
+
+
+def test_unsampled_trace_drops_children():
+    exporter = ListExporter()
+    tracer = tracing.Tracer(exporter, sample_rate=0)
+    with tracer.span('poll'):
+        with tracer.span('parse_status'):
+            pass
+    assert exporter.spans == []
+
+
+def test_file_exporter_writes_otlp_lines(tmp_path):
+    path = str(tmp_path / 'spans.jsonl')
+    tracer = tracing.Tracer(tracing.FileExporter(path, interval=0.1))
+    with tracer.span('telegram.send', chat_id=1):
+        pass
+    tracer.shutdown()
+    with open(path, encoding='utf-8') as file:
+        span = json.loads(file.readline())
+    assert span['name'] == 'telegram.send'
+    assert span['attributes'] == [
+        {'key': 'chat_id', 'value': {'stringValue': '1'}}
+    ]
+
+
+def test_profiler_toggle_dumps_stats(tmp_path):
+    profiler = tracing.ProfilerToggle(str(tmp_path))
+    assert profiler.toggle() is None
+    sum(range(1000))
+    path = profiler.toggle()
+    assert os.path.exists(path)
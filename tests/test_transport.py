@@ -0,0 +1,131 @@
+import sys
+import time
+from http import HTTPStatus
+
+import pytest
+import requests
+
+import utils
+from exceptions import (
+    APIResponseError,
+    RateLimitedError,
+    RequestResponseError,
+    UnauthorizedError,
+    WrongResponseStatusError,
+)
+from simulator import Simulator
+from transport import (
+    FakeTransport, RequestsTransport, SessionTransport, make_transport,
+)
+
+URL = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+HEADERS = {'Authorization': 'OAuth token'}
+
+
+def test_fake_transport_maps_errors():
+    transport = FakeTransport()
+    transport.add(status_code=HTTPStatus.INTERNAL_SERVER_ERROR, body={})
+    transport.add(body='not json')
+    transport.add(error='connection reset')
+    transport.add(
+        status_code=HTTPStatus.TOO_MANY_REQUESTS, headers={'Retry-After': '5'}
+    )
+    expected = (
+        WrongResponseStatusError,
+        APIResponseError,
+        RequestResponseError,
+        RateLimitedError,
+    )
+    for error_class in expected:
+        with pytest.raises(error_class):
+            transport.get_json(URL, HEADERS, {'from_date': 0})
+
+
+def test_fake_transport_default_response():
+    transport = FakeTransport()
+    response = transport.get_json(URL, HEADERS, {'from_date': 42})
+    assert response == {'homeworks': [], 'current_date': 42}
+    assert transport.calls == [(URL, HEADERS, {'from_date': 42})]
+
+
+def test_requests_transport_maps_request_exception(monkeypatch):
+    def failing_get(*args, **kwargs):
+        raise requests.ConnectionError('no route')
+
+    monkeypatch.setattr(requests, 'get', failing_get)
+    with pytest.raises(RequestResponseError):
+        RequestsTransport().get_json(URL, HEADERS, {'from_date': 0})
+
+
+def test_requests_transport_maps_status(monkeypatch):
+    def unauthorized_get(*args, **kwargs):
+        return utils.MockResponseGET(http_status=HTTPStatus.UNAUTHORIZED)
+
+    monkeypatch.setattr(requests, 'get', unauthorized_get)
+    with pytest.raises(WrongResponseStatusError):
+        RequestsTransport().get_json(URL, HEADERS, {'from_date': 0})
+
+
+def test_requests_transport_keeps_only_used_fields():
+    with Simulator(mean_transition=0.01) as simulator:
+        time.sleep(0.05)
+        response = requests.get(
+            simulator.practicum_url,
+            headers={**HEADERS, 'Accept-Encoding': 'gzip'},
+            params={'from_date': 0},
+            timeout=1,
+        )
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'lesson_name' in response.json()['homeworks'][0]
+        data = RequestsTransport(timeout=1).get_json(
+            simulator.practicum_url, HEADERS, {'from_date': 0}
+        )
+    assert data['homeworks']
+    for homework in data['homeworks']:
+        assert set(homework) <= {
+            'id', 'homework_name', 'status', 'reviewer_comment',
+            'date_updated',
+        }
+        assert 'lesson_name' not in homework
+
+
+def test_unknown_transport():
+    with pytest.raises(ValueError):
+        make_transport('carrier-pigeon')
+
+
+def test_http2_transport_maps_errors():
+    pytest.importorskip('h2')
+    pytest.importorskip('httpx')
+    from transport import HTTP2Transport
+
+    with Simulator(mean_transition=0.01, tokens=['token']) as simulator:
+        time.sleep(0.05)
+        url = simulator.practicum_url
+        transport = HTTP2Transport(timeout=1)
+        try:
+            data = transport.get_json(url, HEADERS, {'from_date': 0})
+            assert data['homeworks']
+            assert 'lesson_name' not in data['homeworks'][0]
+            with pytest.raises(UnauthorizedError):
+                transport.get_json(
+                    url, {'Authorization': 'OAuth other'}, {'from_date': 0}
+                )
+            simulator.error_rate = 1
+            with pytest.raises(WrongResponseStatusError):
+                transport.get_json(url, HEADERS, {'from_date': 0})
+        finally:
+            transport.close()
+    transport = HTTP2Transport(timeout=1)
+    try:
+        with pytest.raises(RequestResponseError):
+            transport.get_json(url, HEADERS, {'from_date': 0})
+    finally:
+        transport.close()
+
+
+def test_missing_optional_dependency_falls_back(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'httpx', None)
+    transport = make_transport('http2', timeout=3)
+    assert isinstance(transport, SessionTransport)
+    assert transport.timeout == 3
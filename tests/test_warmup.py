@@ -0,0 +1,70 @@
+import socket
+import threading
+
+import pytest
+
+from simulator import Simulator
+from transport import SessionTransport
+from utils import FakeClock
+from warmup import ConnectionWarmer, DNSCache, reopen
+
+
+def test_dns_cache_expires_and_survives_resolver_failure():
+    clock = FakeClock(0.0)
+    calls = []
+    failing = False
+
+    def resolve(host, port, *args):
+        calls.append(host)
+        if failing:
+            raise socket.gaierror('temporary failure in name resolution')
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('10.0.0.1', 443))]
+
+    dns = DNSCache(['api.example'], ttl=300, resolve=resolve, clock=clock)
+    first = dns.getaddrinfo('api.example', 443, 0, socket.SOCK_STREAM)
+    assert dns.getaddrinfo('api.example', 443, 0, socket.SOCK_STREAM) == first
+    dns.getaddrinfo('other.example', 443)
+    assert calls == ['api.example', 'other.example']
+    clock.now += 301
+    failing = True
+    assert dns.getaddrinfo('api.example', 443, 0, socket.SOCK_STREAM) == first
+    assert calls[-1] == 'api.example'
+    clock.now += 3600
+    with pytest.raises(socket.gaierror):
+        dns.getaddrinfo('api.example', 443, 0, socket.SOCK_STREAM)
+
+
+def test_reopen_reconnects_dropped_connections():
+    with Simulator() as simulator:
+        transport = SessionTransport(pool_size=2)
+        pool = transport.pool(simulator.practicum_url)
+        assert reopen(pool, 2) == 2
+        assert reopen(pool, 2) == 0
+        # Сервер закрыл соединение, пока бот спал
+        connection = pool._get_conn()
+        connection.close()
+        pool._put_conn(connection)
+        assert reopen(pool, 2) == 1
+        headers = {'Authorization': 'OAuth student'}
+        transport.get_json(
+            simulator.practicum_url, headers, {'from_date': 0}
+        )
+        # Запрос ушёл по прогретому соединению, новых не открывалось
+        assert pool.num_connections == 2
+        assert reopen(pool, 2) == 0
+        transport.close()
+
+
+def test_warmer_runs_lead_seconds_before_the_cycle():
+    warmed = threading.Event()
+
+    def target():
+        warmed.set()
+
+    warmer = ConnectionWarmer([(target, 1)], lead=0.05).start()
+    try:
+        warmer.schedule(warmer.clock() + 0.1)
+        assert not warmed.wait(0.02)
+        assert warmed.wait(0.5)
+    finally:
+        warmer.stop()
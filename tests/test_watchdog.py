@@ -0,0 +1,102 @@
+from utils import FakeClock
+from watchdog import LAGGING, RECOVERED, CycleWatchdog
+
+
+def run_cycle(watchdog, clock, work, sleep):
+    watchdog.cycle_started()
+    clock.now += work
+    state = watchdog.cycle_finished()
+    clock.now += sleep
+    return state
+
+
+def test_watchdog_reports_lag_and_recovery():
+    clock = FakeClock(0.0)
+    watchdog = CycleWatchdog(period=600, threshold=0.5, clock=clock)
+    assert run_cycle(watchdog, clock, work=10, sleep=600) is None
+    assert run_cycle(watchdog, clock, work=400, sleep=600) == LAGGING
+    assert watchdog.lag == 10
+    # Отставание прошлого цикла держит бота в перегрузке ещё на цикл
+    assert run_cycle(watchdog, clock, work=10, sleep=600) is None
+    assert watchdog.lag == 400
+    assert run_cycle(watchdog, clock, work=10, sleep=600) == RECOVERED
+
+
+def test_watchdog_accumulates_drift():
+    clock = FakeClock(0.0)
+    watchdog = CycleWatchdog(period=600, clock=clock)
+    for _ in range(4):
+        run_cycle(watchdog, clock, work=5, sleep=600)
+    watchdog.cycle_started()
+    assert watchdog.drift == 20
+
+
+def test_cursor_follows_server_current_date(fake_api, homework_module):
+    from coalescing import SingleFlight
+    from outbox import Outbox
+    from subscriptions import Subscription
+
+    fake_api.respond = lambda from_date: {
+        'homeworks': [], 'current_date': 1000000777,
+    }
+    subscription = Subscription('token', 1, cursor=1000000000)
+    homework_module.poll_subscription(subscription, SingleFlight(), Outbox())
+    assert subscription.cursor == 1000000777
+
+
+def test_delta_with_several_changes_is_reported_once(fake_api,
+                                                     homework_module):
+    from coalescing import SingleFlight
+    from outbox import Outbox
+    from subscriptions import Subscription
+
+    homeworks = [
+        {'id': 2, 'homework_name': 'hw02', 'status': 'reviewing',
+         'date_updated': '2024-01-02T00:00:00Z'},
+        {'id': 1, 'homework_name': 'hw01', 'status': 'approved',
+         'date_updated': '2024-01-01T00:00:00Z'},
+    ]
+    responses = [
+        {'homeworks': homeworks, 'current_date': 1000000777},
+        # Общий ответ из кэша может оказаться старше курсора
+        {'homeworks': homeworks[:1], 'current_date': 1000000500},
+    ]
+    fake_api.respond = lambda from_date: responses.pop(0)
+    outbox = Outbox()
+    subscription = Subscription('delta-token', 1, cursor=1000000000)
+    for _ in range(2):
+        homework_module.poll_subscription(
+            subscription, SingleFlight(), outbox
+        )
+    assert [message.text for message in outbox.pending()] == [
+        homework_module.parse_status(homeworks[1]),
+        homework_module.parse_status(homeworks[0]),
+    ]
+    assert subscription.cursor == 1000000777
+    assert fake_api.requested[1] < 1000000777 - homework_module.CURSOR_OVERLAP + 1
+
+
+def test_unknown_status_does_not_block_the_subscription(fake_api,
+                                                         homework_module):
+    from coalescing import SingleFlight
+    from outbox import Outbox
+    from subscriptions import Subscription
+
+    approved = {'id': 1, 'homework_name': 'hw01', 'status': 'approved',
+                'date_updated': '2024-01-01T00:00:00Z'}
+    returned = {'id': 2, 'homework_name': 'hw02', 'status': 'returned',
+                'date_updated': '2024-01-02T00:00:00Z'}
+
+    fake_api.respond = lambda from_date: {
+        'homeworks': [returned, approved], 'current_date': 1000000777,
+    }
+    outbox = Outbox()
+    subscription = Subscription('returned-token', 1, cursor=1000000000)
+    assert homework_module.poll_subscription(
+        subscription, SingleFlight(), outbox
+    )
+    assert subscription.cursor == 1000000777
+    assert subscription.last_error is None
+    assert [message.text for message in outbox.pending()] == [
+        homework_module.parse_status(approved)
+    ]
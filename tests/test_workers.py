@@ -0,0 +1,49 @@
+import threading
+import time
+
+from workers import PollPool, Sender
+
+
+def test_pool_polls_concurrently():
+    barrier = threading.Barrier(4, timeout=1)
+    polled = []
+
+    def poll(subscription):
+        barrier.wait()
+        polled.append(subscription)
+
+    pool = PollPool(workers=4)
+    try:
+        assert pool.run(range(8), poll, time.monotonic() + 60) == []
+    finally:
+        pool.shutdown()
+    assert sorted(polled) == list(range(8))
+
+
+def test_pool_returns_subscriptions_past_deadline():
+    now = [0]
+
+    def poll(subscription):
+        now[0] += 10
+
+    pool = PollPool(workers=1, clock=lambda: now[0])
+    assert pool.run(range(5), poll, deadline=25) == [3, 4]
+
+
+def test_sender_delivers_from_one_thread():
+    threads = set()
+    delivered = threading.Event()
+
+    def deliver():
+        threads.add(threading.current_thread().name)
+        delivered.set()
+
+    sender = Sender(deliver).start()
+    workers = [threading.Thread(target=sender.notify) for _ in range(10)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert delivered.wait(1)
+    sender.stop()
+    assert threads == {'sender'}
@@ -114,6 +114,19 @@ class MockTelegramBot:
         self.text = text
 
 
+class FakeClock:
+    """Часы, которые идут только по команде: `clock.now += ...`."""
+
+    def __init__(self, now=1000000000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
 class BreakInfiniteLoop(Exception):
     pass
 
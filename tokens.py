@@ -0,0 +1,115 @@
+import logging
+import threading
+import time
+
+from exceptions import UnauthorizedError
+from subscriptions import token_fingerprint
+
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN = 'unknown'
+VALID = 'valid'
+QUARANTINED = 'quarantined'
+
+
+class TokenState:
+    """Что известно о токене: статус проверки и карантин."""
+
+    __slots__ = ('headers', 'status', 'strikes', 'until')
+
+    def __init__(self, token):
+        self.headers = {'Authorization': f'OAuth {token}'}
+        self.status = UNKNOWN
+        self.strikes = 0
+        self.until = 0
+
+
+class TokenManager:
+    """Проверяет токены Практикума и хранит их заголовки авторизации.
+
+    Новый токен проверяется один раз дешёвым запросом `probe(headers)` —
+    с `from_date`, равным текущему времени, ответ почти пустой. Токен,
+    отвергнутый API, уходит в карантин: до его конца подписки токена не
+    опрашиваются, а каждый следующий отказ удваивает срок вплоть до
+    `quarantine_max`. Первый удачный запрос после карантина снимает его.
+    """
+
+    def __init__(self, probe=None, quarantine=600, quarantine_max=86400,
+                 clock=time.time):
+        self.probe = probe
+        self.quarantine_base = quarantine
+        self.quarantine_max = quarantine_max
+        self.clock = clock
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def _state(self, token):
+        with self._lock:
+            state = self._states.get(token)
+            if state is None:
+                state = self._states[token] = TokenState(token)
+            return state
+
+    def headers(self, token):
+        """Возвращает заголовки авторизации токена, собранные один раз."""
+        return self._state(token).headers
+
+    def status(self, token):
+        """Возвращает статус токена."""
+        return self._state(token).status
+
+    def usable(self, token):
+        """Можно ли опрашивать API с этим токеном прямо сейчас.
+
+        Непроверенный токен проверяется пробным запросом: отказ API
+        пробрасывается как `UnauthorizedError`, а сетевой сбой пробы
+        отказом не считается, и токен остаётся непроверенным.
+        """
+        state = self._state(token)
+        if state.status == QUARANTINED:
+            return self.clock() >= state.until
+        if state.status == VALID or self.probe is None:
+            return True
+        try:
+            self.probe(state.headers)
+        except UnauthorizedError:
+            raise
+        except Exception as error:
+            logger.warning(
+                f'token {token_fingerprint(token)} probe failed: {error}'
+            )
+            return True
+        self.accept(token)
+        return True
+
+    def accept(self, token):
+        """Отмечает, что API принял токен, и снимает карантин."""
+        state = self._state(token)
+        with self._lock:
+            if state.status == QUARANTINED:
+                logger.info(
+                    f'token {token_fingerprint(token)} is accepted again'
+                )
+            state.status = VALID
+            state.strikes = 0
+
+    def reject(self, token, error=None):
+        """Отправляет токен в карантин, возвращает True при первом отказе."""
+        state = self._state(token)
+        with self._lock:
+            if state.status == QUARANTINED and self.clock() < state.until:
+                # Отказ по уже закрытому токену из параллельного запроса
+                return False
+            state.strikes += 1
+            period = min(
+                self.quarantine_base * 2 ** (state.strikes - 1),
+                self.quarantine_max,
+            )
+            state.status = QUARANTINED
+            state.until = self.clock() + period
+        logger.error(
+            f'token {token_fingerprint(token)} is rejected ({error}), '
+            f'quarantined for {period} s'
+        )
+        return state.strikes == 1
@@ -0,0 +1,300 @@
+import cProfile
+import json
+import logging
+import os
+import queue
+import random
+import signal
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import requests
+
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = 'homework-bot'
+STATUS_ERROR = 2
+
+
+class _NoopSpan:
+    """Пустой span: используется, когда трассировка выключена."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set_attribute(self, key, value):
+        """Ничего не делает."""
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _UnsampledSpan(_NoopSpan):
+    """Корень трассы, не попавший в выборку: глушит и дочерние span'ы."""
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+
+    def __enter__(self):
+        self.tracer._stack().append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer._stack().pop()
+        return False
+
+
+class Span:
+    """Интервал времени одного этапа обработки."""
+
+    __slots__ = (
+        'tracer', 'name', 'trace_id', 'span_id', 'parent_id',
+        'attributes', 'start', 'end', 'error',
+    )
+
+    def __init__(self, tracer, name, trace_id, parent_id, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f'{random.getrandbits(64):016x}'
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = self.end = 0
+        self.error = None
+
+    def __enter__(self):
+        self.tracer._stack().append(self)
+        self.start = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.end = time.time_ns()
+        self.tracer._stack().pop()
+        if exc_value is not None:
+            self.error = repr(exc_value)
+        self.tracer.exporter.export(self)
+        return False
+
+    def set_attribute(self, key, value):
+        """Добавляет атрибут к span'у."""
+        self.attributes[key] = value
+
+    def to_otlp(self):
+        """Возвращает span в JSON-представлении OTLP."""
+        data = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': 1,
+            'startTimeUnixNano': str(self.start),
+            'endTimeUnixNano': str(self.end),
+            'attributes': [
+                {'key': key, 'value': {'stringValue': str(value)}}
+                for key, value in self.attributes.items()
+            ],
+        }
+        if self.parent_id:
+            data['parentSpanId'] = self.parent_id
+        if self.error:
+            data['status'] = {'code': STATUS_ERROR, 'message': self.error}
+        return data
+
+
+class Tracer:
+    """Создаёт span'ы этапов и передаёт законченные экспортёру.
+
+    Без экспортёра `span` возвращает общий пустой объект, так что
+    выключенная трассировка стоит одной проверки атрибута.
+    """
+
+    def __init__(self, exporter=None, sample_rate=1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name, **attributes):
+        """Возвращает контекстный менеджер span'а этапа `name`."""
+        if self.exporter is None:
+            return NOOP_SPAN
+        stack = self._stack()
+        if not stack:
+            if random.random() >= self.sample_rate:
+                return _UnsampledSpan(self)
+            return Span(
+                self, name, f'{random.getrandbits(128):032x}', None,
+                attributes,
+            )
+        parent = stack[-1]
+        if isinstance(parent, _UnsampledSpan):
+            return NOOP_SPAN
+        return Span(self, name, parent.trace_id, parent.span_id, attributes)
+
+    def shutdown(self):
+        """Дожидается выгрузки накопленных span'ов."""
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+class BatchExporter(ABC):
+    """Выгружает span'ы пачками из фонового потока.
+
+    Горячий путь только кладёт span в очередь; при переполнении очереди
+    span отбрасывается, а не тормозит опрос.
+    """
+
+    def __init__(self, batch_size=100, interval=5, max_queue=10000):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue = queue.Queue(max_queue)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name='span-exporter', daemon=True
+        )
+        self._thread.start()
+
+    def export(self, span):
+        """Ставит законченный span в очередь на выгрузку."""
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _collect(self):
+        batch = []
+        deadline = time.monotonic() + self.interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if self._stopped.is_set() or timeout <= 0:
+                    item = self._queue.get_nowait()
+                else:
+                    item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is not None:
+                batch.append(item)
+        return batch
+
+    def _run(self):
+        while not (self._stopped.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if not batch:
+                continue
+            try:
+                self.write_batch([span.to_otlp() for span in batch])
+            except Exception as error:
+                logger.error(f'span export failed: {error}')
+
+    @abstractmethod
+    def write_batch(self, spans):
+        """Выгружает пачку span'ов в формате OTLP."""
+
+    def shutdown(self):
+        """Выгружает оставшиеся span'ы и останавливает поток."""
+        self._stopped.set()
+        # Будим поток, если он ждёт новых span'ов
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        self._thread.join(self.interval + 1)
+
+
+class FileExporter(BatchExporter):
+    """Пишет span'ы в файл построчно, по одному OTLP-span'у в строке."""
+
+    def __init__(self, path, **kwargs):
+        self.path = path
+        super().__init__(**kwargs)
+
+    def write_batch(self, spans):
+        """Дописывает пачку span'ов в файл."""
+        with open(self.path, 'a', encoding='utf-8') as file:
+            for span in spans:
+                file.write(json.dumps(span, ensure_ascii=False) + '\n')
+
+
+class CollectorExporter(BatchExporter):
+    """Отправляет span'ы в коллектор OpenTelemetry по OTLP/HTTP JSON."""
+
+    def __init__(self, url, timeout=5, **kwargs):
+        self.url = url
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def write_batch(self, spans):
+        """Отправляет пачку span'ов в коллектор."""
+        payload = {'resourceSpans': [{
+            'resource': {'attributes': [{
+                'key': 'service.name',
+                'value': {'stringValue': SERVICE_NAME},
+            }]},
+            'scopeSpans': [{'scope': {'name': SERVICE_NAME}, 'spans': spans}],
+        }]}
+        requests.post(self.url, json=payload, timeout=self.timeout)
+
+
+class ProfilerToggle:
+    """Включает и выключает cProfile по сигналу.
+
+    Первый сигнал запускает профилировщик, второй останавливает его и
+    сохраняет статистику в каталог `directory`.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.profile = None
+
+    def install(self, signum=getattr(signal, 'SIGUSR1', None)):
+        """Устанавливает обработчик сигнала."""
+        if signum is not None:
+            signal.signal(signum, self.toggle)
+
+    def toggle(self, signum=None, frame=None):
+        """Запускает профилирование или сохраняет собранный профиль."""
+        if self.profile is None:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+            logger.info('profiling started')
+            return None
+        self.profile.disable()
+        path = os.path.join(
+            self.directory, f'profile-{int(time.time())}.pstats'
+        )
+        self.profile.dump_stats(path)
+        self.profile = None
+        logger.info(f'profile saved to {path}')
+        return path
+
+
+tracer = Tracer()
+
+
+def span(name, **attributes):
+    """Возвращает span этапа из общего трассировщика."""
+    return tracer.span(name, **attributes)
+
+
+def configure(path=None, collector_url=None, sample_rate=1.0):
+    """Включает трассировку, если задан файл или адрес коллектора."""
+    if collector_url:
+        tracer.exporter = CollectorExporter(collector_url)
+    elif path:
+        tracer.exporter = FileExporter(path)
+    else:
+        tracer.exporter = None
+    tracer.sample_rate = sample_rate
+    return tracer
@@ -0,0 +1,306 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from http import HTTPStatus
+
+import requests
+from urllib3.util.request import ACCEPT_ENCODING
+
+import tracing
+from exceptions import (
+    APIResponseError,
+    RateLimitedError,
+    RequestResponseError,
+    UnauthorizedError,
+    WrongResponseStatusError,
+)
+from ratelimit import parse_retry_after
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 30
+# urllib3 объявляет только те сжатия, которые умеет распаковать:
+# br появляется при установленном brotli, gzip и deflate есть всегда
+DEFAULT_HEADERS = {
+    'Accept': 'application/json',
+    'Accept-Encoding': ACCEPT_ENCODING,
+}
+# Поля ответа, которыми пользуется бот; остальные отбрасываются при разборе
+RESPONSE_FIELDS = frozenset((
+    'homeworks', 'current_date', 'id', 'homework_name', 'status',
+    'reviewer_comment', 'date_updated',
+))
+
+
+def keep_fields(pairs):
+    """Собирает объект JSON только из нужных боту полей."""
+    return {key: value for key, value in pairs if key in RESPONSE_FIELDS}
+
+
+def loads_minimal(body):
+    """Разбирает тело ответа, не создавая словарей с лишними полями."""
+    return json.loads(body, object_pairs_hook=keep_fields)
+
+
+def decode_body(response):
+    """Разбирает тело ответа `requests` в урезанном виде.
+
+    Ответ без байтового тела (например, подменённый в тестах) разбирается
+    его собственным `json()`.
+    """
+    content = getattr(response, 'content', None)
+    if isinstance(content, bytes):
+        return loads_minimal(content)
+    return response.json()
+
+
+def handle_response(url, status_code, headers, decode):
+    """Проверяет статус ответа и разбирает JSON для любого транспорта."""
+    if status_code == HTTPStatus.TOO_MANY_REQUESTS:
+        raise RateLimitedError(
+            f'Rate limited: {url}.',
+            retry_after=parse_retry_after(headers.get('Retry-After')),
+        )
+    if status_code in (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN):
+        raise UnauthorizedError(
+            f'Token rejected: {url}. Status code: {status_code}.'
+        )
+    if status_code != HTTPStatus.OK:
+        raise WrongResponseStatusError(
+            f'Failed request: {url}. Status code: {status_code}.'
+        )
+    try:
+        with tracing.span('json.decode'):
+            return decode()
+    except ValueError:
+        raise APIResponseError('Response is not parsable')
+
+
+class Transport(ABC):
+    """Транспорт для запросов к API Практикума."""
+
+    @abstractmethod
+    def get_json(self, url, headers, params, timeout=None):
+        """Делает GET-запрос и возвращает разобранный JSON.
+
+        `timeout` в секундах заменяет тайм-аут транспорта для этого запроса.
+        """
+
+    def pool(self, url):
+        """Пул соединений urllib3 с `url` или None, если пула нет."""
+        return None
+
+    def close(self):
+        """Освобождает соединения транспорта."""
+        pass
+
+
+class RequestsTransport(Transport):
+    """Синхронный транспорт на `requests.get`."""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+
+    def get_json(self, url, headers, params, timeout=None):
+        """Делает GET-запрос и возвращает разобранный JSON."""
+        try:
+            response = requests.get(
+                url,
+                headers={**DEFAULT_HEADERS, **headers},
+                params=params,
+                timeout=timeout or self.timeout,
+            )
+        except requests.RequestException as error:
+            raise RequestResponseError(f'Request to {url} failed '
+                                       f'with params: {params}. '
+                                       f'Error: {error}.')
+        return handle_response(
+            url,
+            response.status_code,
+            getattr(response, 'headers', {}),
+            lambda: decode_body(response),
+        )
+
+
+class SessionTransport(RequestsTransport):
+    """Транспорт на общей `requests.Session` с пулом соединений.
+
+    Потоки опроса делят одну сессию: соединения с API переиспользуются,
+    а пул ограничен `pool_size` соединениями, лишние запросы ждут
+    свободного.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, pool_size=None):
+        super().__init__(timeout)
+        if pool_size is None:
+            pool_size = int(os.getenv('POLL_WORKERS', 1))
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, pool_block=True
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get_json(self, url, headers, params, timeout=None):
+        """Делает GET-запрос и возвращает разобранный JSON."""
+        try:
+            response = self.session.get(
+                url, headers=headers, params=params,
+                timeout=timeout or self.timeout,
+            )
+        except requests.RequestException as error:
+            raise RequestResponseError(f'Request to {url} failed '
+                                       f'with params: {params}. '
+                                       f'Error: {error}.')
+        return handle_response(
+            url,
+            response.status_code,
+            response.headers,
+            lambda: decode_body(response),
+        )
+
+    def pool(self, url):
+        """Пул соединений сессии с `url`."""
+        return self.session.get_adapter(url).get_connection(url)
+
+    def close(self):
+        """Закрывает соединения сессии."""
+        self.session.close()
+
+
+class HTTP2Transport(Transport):
+    """Асинхронный транспорт на httpx с HTTP/2.
+
+    Клиент живёт в собственном цикле событий в фоновом потоке, поэтому
+    запросы из разных потоков мультиплексируются поверх нескольких
+    соединений. Корутину `aget_json` можно вызывать и напрямую из этого
+    цикла. Нужен необязательный `httpx[http2]` из `requirements-http2.txt`.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_connections=10):
+        try:
+            import httpx
+        except ImportError as error:
+            raise ImportError(
+                'HTTP2Transport requires `httpx[http2]` to be installed'
+            ) from error
+        self._httpx = httpx
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name='http2-transport', daemon=True
+        )
+        self._thread.start()
+        limits = httpx.Limits(max_connections=max_connections)
+        self._client = self._run(self._create_client(timeout, limits))
+
+    async def _create_client(self, timeout, limits):
+        return self._httpx.AsyncClient(
+            http2=True, timeout=timeout, limits=limits
+        )
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    async def aget_json(self, url, headers, params, timeout=None):
+        """Делает GET-запрос и возвращает разобранный JSON."""
+        options = {} if timeout is None else {'timeout': timeout}
+        try:
+            response = await self._client.get(
+                url, headers={**DEFAULT_HEADERS, **headers}, params=params,
+                **options,
+            )
+        except self._httpx.HTTPError as error:
+            raise RequestResponseError(f'Request to {url} failed '
+                                       f'with params: {params}. '
+                                       f'Error: {error}.')
+        return handle_response(
+            url,
+            response.status_code,
+            response.headers,
+            lambda: loads_minimal(response.content),
+        )
+
+    def get_json(self, url, headers, params, timeout=None):
+        """Делает GET-запрос и возвращает разобранный JSON."""
+        return self._run(self.aget_json(url, headers, params, timeout))
+
+    def close(self):
+        """Закрывает клиент и останавливает цикл событий."""
+        self._run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+FakeResponse = namedtuple(
+    'FakeResponse', ('status_code', 'body', 'headers', 'error'),
+    defaults=(HTTPStatus.OK, None, None, None),
+)
+
+
+class FakeTransport(Transport):
+    """Транспорт в памяти для тестов: отдаёт заранее заданные ответы.
+
+    Если очередь ответов пуста, отвечает пустым списком работ с
+    `current_date`, равным `from_date` запроса.
+    """
+
+    def __init__(self, responses=()):
+        self.responses = list(responses)
+        self.calls = []
+
+    def add(self, **kwargs):
+        """Добавляет ответ в очередь, `body` можно передать словарём."""
+        if not isinstance(kwargs.get('body', ''), str):
+            kwargs['body'] = json.dumps(kwargs['body'])
+        self.responses.append(FakeResponse(**kwargs))
+
+    def get_json(self, url, headers, params, timeout=None):
+        """Делает GET-запрос и возвращает разобранный JSON."""
+        self.calls.append((url, headers, params))
+        if self.responses:
+            response = self.responses.pop(0)
+        else:
+            response = FakeResponse(body=json.dumps({
+                'homeworks': [], 'current_date': params.get('from_date'),
+            }))
+        if response.error is not None:
+            raise RequestResponseError(f'Request to {url} failed '
+                                       f'with params: {params}. '
+                                       f'Error: {response.error}.')
+        return handle_response(
+            url,
+            response.status_code,
+            response.headers or {},
+            lambda: loads_minimal(response.body),
+        )
+
+
+TRANSPORTS = {
+    'requests': RequestsTransport,
+    'session': SessionTransport,
+    'http2': HTTP2Transport,
+    'fake': FakeTransport,
+}
+
+
+def make_transport(name, **kwargs):
+    """Создаёт транспорт по имени из `TRANSPORTS`.
+
+    Если для транспорта не установлена необязательная зависимость, бот
+    всё равно запускается: вместо него берётся `SessionTransport`.
+    """
+    try:
+        transport_class = TRANSPORTS[name]
+    except KeyError:
+        raise ValueError(f'Unknown transport: {name}')
+    try:
+        return transport_class(**kwargs)
+    except ImportError as error:
+        logger.error(f'{error}, using the session transport instead')
+        return SessionTransport(timeout=kwargs.get('timeout', DEFAULT_TIMEOUT))
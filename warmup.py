@@ -0,0 +1,190 @@
+import logging
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def host_port(url):
+    """Возвращает хост и порт адреса."""
+    parts = urlsplit(url)
+    return parts.hostname, parts.port or DEFAULT_PORTS.get(parts.scheme, 80)
+
+
+class DNSCache:
+    """Кэш `socket.getaddrinfo` с TTL для хостов бота.
+
+    Кэшируются только ответы для хостов из `hosts`, остальные запросы идут
+    в резолвер как обычно. Если резолвер не ответил, а в кэше есть старый
+    ответ, используется он: кратковременный сбой DNS не мешает опросу.
+    Ответ, устаревший больше чем на `max_stale` секунд, не используется,
+    чтобы сменивший адрес хост не остался недоступным до перезапуска.
+    """
+
+    def __init__(self, hosts=(), ttl=300, max_stale=3600,
+                 resolve=socket.getaddrinfo, clock=time.monotonic):
+        self.hosts = set(hosts)
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.resolve = resolve
+        self.clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._installed = None
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        """Замена `socket.getaddrinfo` с кэшем."""
+        if host not in self.hosts:
+            return self.resolve(host, port, family, type, proto, flags)
+        key = (host, port, family, type, proto, flags)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and self.clock() < entry[0]:
+            return entry[1]
+        return self._refresh(key, stale=entry)
+
+    def _refresh(self, key, stale=None):
+        try:
+            addresses = self.resolve(*key)
+        except OSError as error:
+            if stale is None or self.clock() >= stale[0] + self.max_stale:
+                raise
+            logger.warning(f'DNS lookup of {key[0]} failed, using cached '
+                           f'addresses: {error}')
+            return stale[1]
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, addresses)
+        return addresses
+
+    def refresh(self, host):
+        """Заново разрешает все закэшированные запросы для хоста."""
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == host]
+            stale = [self._entries[key] for key in keys]
+        for key, entry in zip(keys, stale):
+            self._refresh(key, stale=entry)
+
+    def install(self):
+        """Подставляет кэш вместо `socket.getaddrinfo`."""
+        self._installed = socket.getaddrinfo
+        socket.getaddrinfo = self.getaddrinfo
+        return self
+
+    def uninstall(self):
+        """Возвращает прежний `socket.getaddrinfo`."""
+        if self._installed is not None:
+            socket.getaddrinfo = self._installed
+            self._installed = None
+
+
+def reopen(pool, connections=1):
+    """Открывает до `connections` соединений пула urllib3 заранее.
+
+    Соединения берутся из пула как для запроса: отвалившиеся за время
+    простоя urllib3 закрывает сам, и они, как и ещё не открытые,
+    подключаются здесь, с разрешением имени и TLS. Возвращает число
+    открытых соединений.
+    """
+    taken, opened = [], 0
+    try:
+        # Занятые соединения не ждём: по ним уже идут запросы
+        for _ in range(min(connections, pool.pool.qsize())):
+            connection = pool._get_conn(timeout=0)
+            taken.append(connection)
+            if connection.sock is None:
+                connection.connect()
+                opened += 1
+    finally:
+        for connection in taken:
+            pool._put_conn(connection)
+    return opened
+
+
+class ConnectionWarmer:
+    """Прогревает DNS и соединения незадолго до следующего цикла опроса.
+
+    Пока бот спит `RETRY_PERIOD`, сервер закрывает простаивающие
+    соединения, и первый запрос цикла платил бы за DNS, TCP и TLS. Поток
+    прогрева просыпается за `lead` секунд до запланированного цикла,
+    освежает кэш DNS и заново открывает соединения в пулах, так что на
+    пути уведомления остаётся только сам запрос. `lead` должен быть
+    меньше тайм-аута простоя на стороне сервера.
+
+    `targets` — пары `(получение пула urllib3, число соединений)`; пул
+    запрашивается при каждом прогреве, функция может вернуть None. Кэш
+    `dns` подставляется на время работы потока. С `lead=0` прогрев
+    выключен.
+    """
+
+    def __init__(self, targets, dns=None, lead=5, clock=time.monotonic):
+        self.targets = targets
+        self.dns = dns
+        self.lead = lead
+        self.clock = clock
+        self._due = None
+        self._stopped = False
+        self._wake = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name='warmer', daemon=True
+        )
+
+    def start(self):
+        """Запускает поток прогрева."""
+        if not self.lead:
+            return self
+        if self.dns is not None:
+            self.dns.install()
+        self._thread.start()
+        return self
+
+    def schedule(self, at):
+        """Планирует прогрев к циклу, который начнётся в момент `at`."""
+        if not self.lead:
+            return
+        self._due = at - self.lead
+        self._wake.set()
+
+    def warm(self):
+        """Освежает DNS и открывает соединения, возвращает число открытых."""
+        if self.dns is not None:
+            for host in self.dns.hosts:
+                try:
+                    self.dns.refresh(host)
+                except OSError as error:
+                    logger.warning(f'DNS refresh of {host} failed: {error}')
+        opened = 0
+        for get_pool, connections in self.targets:
+            try:
+                pool = get_pool()
+                if pool is not None:
+                    opened += reopen(pool, connections)
+            except Exception as error:
+                logger.warning(f'connection warm-up failed: {error}')
+        logger.debug(f'warmed up {opened} connections')
+        return opened
+
+    def _run(self):
+        while not self._stopped:
+            due = self._due
+            if due is None:
+                self._wake.wait()
+            elif not self._wake.wait(max(due - self.clock(), 0)):
+                self._due = None
+                self.warm()
+                continue
+            self._wake.clear()
+
+    def stop(self):
+        """Останавливает поток прогрева."""
+        if not self._thread.is_alive():
+            return
+        self._stopped = True
+        self._wake.set()
+        self._thread.join()
+        if self.dns is not None:
+            self.dns.uninstall()
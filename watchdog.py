@@ -0,0 +1,70 @@
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+LAGGING = 'lagging'
+RECOVERED = 'recovered'
+
+
+class CycleWatchdog:
+    """Следит за длительностью циклов опроса и отставанием от расписания.
+
+    Отставание цикла — насколько позже запланированного он начался:
+    сюда входят и работа прошлого цикла, и пересып. Когда длительность или
+    отставание превышают долю `threshold` от периода, бот считается
+    перегруженным; о входе в это состояние и выходе из него сообщает
+    `cycle_finished`.
+    """
+
+    def __init__(self, period, threshold=0.5, clock=time.monotonic):
+        self.period = period
+        self.threshold = threshold
+        self.clock = clock
+        self.cycles = 0
+        self.duration = 0
+        self.lag = 0
+        self.drift = 0
+        self.overloaded = False
+        self._started = None
+        self._first_started = None
+
+    def cycle_started(self):
+        """Отмечает начало цикла и считает отставание от расписания."""
+        now = self.clock()
+        if self._started is None:
+            self._first_started = now
+        else:
+            self.lag = max(0, now - self._started - self.period)
+            # Накопленный сдвиг относительно идеального расписания
+            self.drift = now - self._first_started - self.cycles * self.period
+        self._started = now
+
+    def cycle_finished(self):
+        """Отмечает конец цикла, возвращает смену состояния или None."""
+        self.duration = self.clock() - self._started
+        self.cycles += 1
+        behind = max(self.duration, self.lag)
+        overloaded = behind > self.threshold * self.period
+        if overloaded == self.overloaded:
+            return None
+        self.overloaded = overloaded
+        if overloaded:
+            logger.warning(
+                f'poll cycle is behind schedule: took {self.duration:.1f}s, '
+                f'started {self.lag:.1f}s late'
+            )
+            return LAGGING
+        logger.info('poll cycle is back on schedule')
+        return RECOVERED
+
+    def report(self):
+        """Возвращает показатели последнего цикла."""
+        return {
+            'cycles': self.cycles,
+            'duration': self.duration,
+            'lag': self.lag,
+            'drift': self.drift,
+            'period': self.period,
+        }
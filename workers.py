@@ -0,0 +1,91 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+logger = logging.getLogger(__name__)
+
+
+class PollPool:
+    """Опрашивает подписки цикла в ограниченном пуле потоков.
+
+    При `workers=1` опрос идёт в вызывающем потоке без пула. Подписка,
+    до которой очередь дошла после `deadline`, не опрашивается и
+    возвращается вызывающему для учёта.
+    """
+
+    def __init__(self, workers=1, clock=time.monotonic):
+        self.workers = workers
+        self.clock = clock
+        self._executor = None
+        if workers > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix='poll'
+            )
+
+    def run(self, subscriptions, poll, deadline):
+        """Опрашивает подписки через `poll`, возвращает неопрошенные."""
+        def job(subscription):
+            if self.clock() > deadline:
+                return subscription
+            poll(subscription)
+            return None
+
+        if self._executor is None:
+            results = map(job, subscriptions)
+        else:
+            futures = [
+                self._executor.submit(job, subscription)
+                for subscription in subscriptions
+            ]
+            results = (future.result() for future in futures)
+        return [
+            subscription for subscription in results
+            if subscription is not None
+        ]
+
+    def shutdown(self):
+        """Дожидается запущенных опросов и останавливает потоки."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+class Sender:
+    """Единственный поток отправки в Telegram.
+
+    Потоки опроса только ставят сообщения в очередь и будят отправителя
+    через `notify`; сам `deliver` всегда вызывается из этого потока.
+    """
+
+    def __init__(self, deliver):
+        self.deliver = deliver
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._run, name='sender', daemon=True
+        )
+
+    def start(self):
+        """Запускает поток отправки."""
+        self._thread.start()
+        return self
+
+    def notify(self):
+        """Сообщает, что в очереди появились сообщения."""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                self.deliver()
+            except Exception as error:
+                logger.error(f'delivery failed: {error}', exc_info=True)
+
+    def stop(self):
+        """Досылает очередь и останавливает поток."""
+        self._stopped = True
+        self._wake.set()
+        self._thread.join()